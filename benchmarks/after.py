@@ -0,0 +1,81 @@
+"""Benchmark making moves on the object model.
+
+Run from the root of the repository:
+
+    python -m benchmarks.after [PUZZLE ...]
+
+By default the states one move from every json puzzle in the levels folder
+are collected and every move from them is made, comparing copying both
+containers and pouring between the copies with building the poured
+containers directly, and timing the whole of `ContainerCollection.after`.
+As every move is made many times `after` mostly finds its pours in the
+shared pour cache, whose hit rate is printed.
+"""
+import pathlib
+import sys
+import time
+from typing import Callable, List, Tuple
+
+from solver.lib import file2collection
+from solver.lib.collection import ContainerCollection, PourCache
+from solver.lib.move import Move
+
+LEVELS = pathlib.Path(__file__).parent.parent / "levels"
+
+# The number of times every move is made
+REPEATS = 50
+
+
+def _copy_and_pour(state: ContainerCollection, move: Move):
+    """Copy the two containers then pour between the copies."""
+    src, dest = state[move.src].copy(), state[move.dest].copy()
+    src.pour(dest)
+
+
+def _poured(state: ContainerCollection, move: Move):
+    """Build the poured containers directly."""
+    state[move.src].poured(state[move.dest])
+
+
+def _after(state: ContainerCollection, move: Move):
+    """Make the move on the whole collection."""
+    state.after(move)
+
+
+def time_moves(
+    moves: List[Tuple[ContainerCollection, Move]],
+    make: Callable[[ContainerCollection, Move], None],
+) -> float:
+    """Get the mean seconds `make` takes for each of `moves`."""
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        for state, move in moves:
+            make(state, move)
+    return (time.perf_counter() - start) / (REPEATS * len(moves))
+
+
+def main(paths: List[str]):
+    """Benchmark the moves from each puzzle in `paths`."""
+    if not paths:
+        paths = [str(path) for path in sorted(LEVELS.glob("*.json"))]
+    # Share one pour cache between every puzzle, as a search would
+    pours = PourCache()
+    states = []
+    for path in paths:
+        puzzle = file2collection.load(path, reject_invalid=False)
+        puzzle = puzzle.with_pours(pours)
+        states.append(puzzle)
+        states.extend(puzzle.after(move) for move in puzzle.get_moves())
+    moves = [(state, move) for state in states for move in state.get_moves()]
+    print(f"{len(moves)} moves from {len(states)} states")
+    for label, make in (
+        ("copy and pour", _copy_and_pour),
+        ("poured", _poured),
+        ("after", _after),
+    ):
+        print(f"{label:<14} {time_moves(moves, make) * 1e6:>8.2f}us")
+    print(f"pour cache hit rate {pours.hit_rate:.1%}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
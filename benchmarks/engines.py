@@ -0,0 +1,59 @@
+"""Benchmark the packed and NumPy search engines against the object model.
+
+Run from the root of the repository:
+
+    python -m benchmarks.engines [PUZZLE ...]
+
+By default every json puzzle in the levels folder is solved with each
+algorithm on each engine and the time taken is printed.
+"""
+import pathlib
+import sys
+import time
+from typing import Callable, List, Optional
+
+from solver.lib import file2collection, vectorised
+from solver.lib.collection import ContainerCollection
+from solver.lib.search import Option, SearchStats, bfs, dfs
+
+LEVELS = pathlib.Path(__file__).parent.parent / "levels"
+
+Search = Callable[..., Optional[Option]]
+
+
+def run(puzzle: ContainerCollection, search: Search, **kwargs) -> str:
+    """Solve `puzzle` and describe the result and time taken."""
+    stats = SearchStats()
+    start = time.perf_counter()
+    result = search(puzzle, stats, **kwargs)
+    elapsed = time.perf_counter() - start
+    moves = "-" if result is None else str(len(result.moves))
+    return f"{moves:>5} {stats.expanded:>9} {elapsed:>9.3f}s"
+
+
+def main(paths: List[str]):
+    """Benchmark each puzzle in `paths`."""
+    if not paths:
+        paths = [str(path) for path in sorted(LEVELS.glob("*.json"))]
+    print(
+        f"{'puzzle':<30} {'search':<6} {'engine':<6} "
+        f"{'moves':>5} {'expanded':>9} {'time':>10}"
+    )
+    for path in paths:
+        puzzle = file2collection.load(path, reject_invalid=False)
+        name = pathlib.Path(path).name
+        for label, search in (("BFS", bfs), ("DFS", dfs)):
+            for packed in (False, True):
+                engine = "packed" if packed else "object"
+                print(
+                    f"{name:<30} {label:<6} {engine:<6}",
+                    run(puzzle, search, packed=packed),
+                )
+        print(
+            f"{name:<30} {'BFS':<6} {'numpy':<6}",
+            run(puzzle, vectorised.bfs),
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
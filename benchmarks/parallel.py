@@ -0,0 +1,59 @@
+"""Benchmark how the parallel searches scale with the number of workers.
+
+Run from the root of the repository:
+
+    python -m benchmarks.parallel [PUZZLE ...]
+
+By default every json puzzle in the levels folder is solved using the
+serial BFS and A* on the packed engine and then their parallel versions
+with a doubling number of workers up to the number of CPUs.
+"""
+import os
+import pathlib
+import sys
+import time
+from typing import List
+
+from solver.lib import file2collection, parallel
+from solver.lib.search import astar, bfs
+
+LEVELS = pathlib.Path(__file__).parent.parent / "levels"
+
+
+def main(paths: List[str]):
+    """Benchmark each puzzle in `paths`."""
+    if not paths:
+        paths = [str(path) for path in sorted(LEVELS.glob("*.json"))]
+    counts = [1]
+    while counts[-1] * 2 <= (os.cpu_count() or 1):
+        counts.append(counts[-1] * 2)
+    print(
+        f"{'puzzle':<30} {'search':<6} {'workers':>7} "
+        f"{'time':>10} {'speedup':>8}"
+    )
+    for path in paths:
+        puzzle = file2collection.load(path, reject_invalid=False)
+        name = pathlib.Path(path).name
+        for label, serial_search, parallel_search in (
+            ("BFS", bfs, parallel.bfs),
+            ("ASTAR", astar, parallel.astar),
+        ):
+            start = time.perf_counter()
+            serial_search(puzzle, packed=True)
+            serial = time.perf_counter() - start
+            print(
+                f"{name:<30} {label:<6} {'serial':>7} "
+                f"{serial:>9.3f}s {1:>7.2f}x"
+            )
+            for workers in counts:
+                start = time.perf_counter()
+                parallel_search(puzzle, workers=workers)
+                elapsed = time.perf_counter() - start
+                print(
+                    f"{name:<30} {label:<6} {workers:>7} "
+                    f"{elapsed:>9.3f}s {serial / elapsed:>7.2f}x"
+                )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,69 @@
+"""Benchmark how long the command line entry points take to import.
+
+Run from the root of the repository:
+
+    python -m benchmarks.startup [MODULE ...]
+
+Each module is imported in a fresh interpreter with `-X importtime` and the
+total time is printed with the slowest modules it imported. The budget and
+the modules that must only be imported when needed are checked by the
+tests.
+"""
+import subprocess
+import sys
+from typing import Dict, List
+
+ENTRY_POINTS = ("solver.cli.main", "solver.cli.batch", "solver.cli.patterndb")
+
+# Modules only needed for images, some engines or terminal styling
+DEFERRED = (
+    "cv2",
+    "numpy",
+    "sty",
+    "solver.lib.img2collection",
+    "solver.lib.vectorised",
+    "solver.lib.parallel",
+)
+
+# The most time in seconds an entry point may take to import
+BUDGET = 0.25
+
+
+def import_times(module: str) -> Dict[str, float]:
+    """Import `module` in a new interpreter and time every import.
+
+    Returns the seconds taken to import each module including the modules
+    it imported itself.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        stderr=subprocess.PIPE,
+        check=True,
+        universal_newlines=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def main(modules: List[str]):
+    """Benchmark importing each of `modules`."""
+    for module in modules or ENTRY_POINTS:
+        times = import_times(module)
+        print(f"{module:<30} {times[module]:>9.3f}s")
+        slowest = sorted(
+            (name for name in times if name != module),
+            key=times.__getitem__,
+            reverse=True,
+        )
+        for name in slowest[:5]:
+            print(f"    {name:<26} {times[name]:>9.3f}s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
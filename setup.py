@@ -27,10 +27,18 @@ setup(
     long_description_content_type="text/markdown",
     author="Ollie",
     url="https://github.com/discorev/colour-puzzle-solver",
-    packages=find_packages(exclude=["tests.*", "tests"]),
+    packages=find_packages(
+        exclude=["tests.*", "tests", "benchmarks.*", "benchmarks"]
+    ),
     # Support Python 3.7 or greater
     python_requires=">=3.7, <=4.0, !=4.0",
-    entry_points={"console_scripts": ["solver=solver.cli.main:cli"]},
+    entry_points={
+        "console_scripts": [
+            "solver=solver.cli.main:cli",
+            "solver-batch=solver.cli.batch:cli",
+            "solver-pdb=solver.cli.patterndb:cli",
+        ]
+    },
     install_requires=read_requirements("requirements/base.txt"),
     extras_require={"dev": read_requirements("requirements/dev.txt")},
     include_package_data=True,
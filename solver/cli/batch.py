@@ -0,0 +1,332 @@
+"""Entry point for solving many puzzles in one run."""
+import glob
+import json
+import os
+import pathlib
+import sys
+import time
+from multiprocessing import get_context
+from multiprocessing.connection import Connection, wait
+from typing import Callable, Dict, IO, List, Optional
+
+import click
+
+from solver.lib import file2collection
+from solver.lib.cache import SolutionCache, search_tag
+from solver.lib.collection import ContainerCollection
+from solver.lib.search import (
+    Option,
+    SearchStats,
+    anytime,
+    astar,
+    beam,
+    bfs,
+    dfs,
+    idastar,
+)
+
+Search = Callable[[ContainerCollection, SearchStats, bool], Optional[Option]]
+
+
+def _anytime(
+    puzzle: ContainerCollection, stats: SearchStats, packed: bool
+) -> Optional[Option]:
+    """Get the last, and so shortest, solution of the anytime search."""
+    result = None
+    for result in anytime(puzzle, stats, packed=packed):
+        pass
+    return result
+
+
+SEARCHES: Dict[str, Search] = {
+    "BFS": lambda puzzle, stats, packed: bfs(puzzle, stats, packed=packed),
+    "DFS": lambda puzzle, stats, packed: dfs(puzzle, stats, packed=packed),
+    "ASTAR": lambda puzzle, stats, packed: astar(puzzle, stats, packed=packed),
+    "IDASTAR": lambda puzzle, stats, packed: idastar(
+        puzzle, stats, packed=packed
+    ),
+    "BEAM": lambda puzzle, stats, packed: beam(puzzle, stats, packed=packed),
+    "ANYTIME": _anytime,
+}
+
+
+def find_puzzles(sources: List[str]) -> List[str]:
+    """Expand each source into the puzzle files it refers to.
+
+    A source can be a directory, whose json files are used, a text file
+    listing one puzzle path per line, a single puzzle file or a glob.
+    """
+    puzzles: List[str] = []
+    for source in sources:
+        path = pathlib.Path(source)
+        if path.is_dir():
+            puzzles.extend(str(file) for file in sorted(path.glob("*.json")))
+        elif path.is_file() and path.suffix == ".txt":
+            with path.open() as fh:
+                for line in fh:
+                    line = line.strip()
+                    if line and not line.startswith("#"):
+                        puzzles.append(str(path.parent / line))
+        elif path.is_file():
+            puzzles.append(source)
+        else:
+            puzzles.extend(sorted(glob.glob(source, recursive=True)))
+    return puzzles
+
+
+def solve(
+    path: str,
+    algorithm: str,
+    engine: str,
+    validate: bool,
+    solutions: Optional[SolutionCache] = None,
+) -> Dict:
+    """Solve the puzzle at `path` and describe the result.
+
+    Solutions are looked up in and added to `solutions` when given.
+    """
+    stats = SearchStats()
+    start = time.perf_counter()
+    try:
+        puzzle = file2collection.load(path, reject_invalid=validate)
+        result = None
+        # Without a time limit every search is complete, so is cached
+        tag = search_tag(algorithm) or algorithm
+        if solutions is not None:
+            result = solutions.get(puzzle, tag)
+        cached = result is not None
+        if not cached:
+            if engine == "NUMPY":
+                from solver.lib import vectorised  # pylint: disable=C0415
+
+                result = vectorised.bfs(puzzle, stats)
+            else:
+                packed = engine == "PACKED"
+                result = SEARCHES[algorithm](puzzle, stats, packed)
+            if solutions is not None and result is not None:
+                solutions.put(puzzle, result, tag)
+    except Exception as err:  # pylint: disable=W0703
+        return {"puzzle": path, "error": str(err)}
+    return {
+        "puzzle": path,
+        "solved": result is not None,
+        "cached": cached,
+        "moves": None
+        if result is None
+        else [[move.src, move.dest] for move in result.moves],
+        "length": None if result is None else len(result.moves),
+        "expanded": stats.expanded,
+        "time": round(time.perf_counter() - start, 6),
+    }
+
+
+def _serve(
+    conn: Connection,
+    algorithm: str,
+    engine: str,
+    validate: bool,
+    cache: Optional[str],
+):
+    """Solve each puzzle path received on `conn` until given None."""
+    solutions = None if cache is None else SolutionCache(cache)
+    while True:
+        path = conn.recv()
+        if path is None:
+            break
+        conn.send(solve(path, algorithm, engine, validate, solutions))
+    if solutions is not None:
+        solutions.close()
+
+
+class _Worker:
+    """A process solving one puzzle at a time sent to it over a pipe."""
+
+    def __init__(self, *args):
+        """Start a process solving puzzles with the `_serve` `args`."""
+        context = get_context()
+        self.conn, child = context.Pipe()
+        self.process = context.Process(
+            target=_serve,
+            args=(child, *args),
+            daemon=True,
+        )
+        self.process.start()
+        child.close()
+        self.path: Optional[str] = None
+        self.started = 0.0
+
+    def send(self, path: str):
+        """Start solving the puzzle at `path`."""
+        self.path = path
+        self.started = time.perf_counter()
+        self.conn.send(path)
+
+    def stop(self, kill: bool = False):
+        """Stop the process, killing it if it is mid-puzzle."""
+        if kill:
+            self.process.terminate()
+        else:
+            self.conn.send(None)
+        self.process.join()
+        self.conn.close()
+
+
+def run(
+    puzzles: List[str],
+    output: IO[str],
+    *,
+    algorithm: str = "BFS",
+    engine: str = "OBJECT",
+    workers: int = 1,
+    timeout: Optional[float] = None,
+    validate: bool = False,
+    cache: Optional[str] = None,
+):
+    """Solve `puzzles` across `workers` processes writing JSON lines.
+
+    A line is written to `output` as each puzzle finishes. A puzzle that
+    takes longer than `timeout` seconds has its process killed and replaced.
+    Solutions are shared through the `cache` file when given.
+    """
+    args = (algorithm, engine, validate, cache)
+    pending = list(reversed(puzzles))
+    pool = [_Worker(*args) for _ in range(min(workers, len(puzzles)))]
+    busy: Dict[Connection, _Worker] = {}
+
+    def write(record: Dict):
+        output.write(json.dumps(record) + "\n")
+        output.flush()
+
+    def start(worker: _Worker):
+        if pending:
+            worker.send(pending.pop())
+            busy[worker.conn] = worker
+
+    def replace(worker: _Worker):
+        worker.stop(kill=True)
+        pool.remove(worker)
+        if pending:
+            worker = _Worker(*args)
+            pool.append(worker)
+            start(worker)
+
+    try:
+        for worker in pool:
+            start(worker)
+        while busy:
+            wait_for = None
+            if timeout is not None:
+                oldest = min(worker.started for worker in busy.values())
+                wait_for = max(0, oldest + timeout - time.perf_counter())
+            for conn in wait(list(busy), wait_for):
+                worker = busy.pop(conn)  # type: ignore
+                try:
+                    write(worker.conn.recv())
+                except EOFError:
+                    write({"puzzle": worker.path, "error": "worker exited"})
+                    replace(worker)
+                    continue
+                start(worker)
+            if timeout is None:
+                continue
+            now = time.perf_counter()
+            for conn, worker in list(busy.items()):
+                if now - worker.started >= timeout:
+                    del busy[conn]
+                    write(
+                        {
+                            "puzzle": worker.path,
+                            "error": "timeout",
+                            "time": timeout,
+                        }
+                    )
+                    replace(worker)
+    finally:
+        for worker in pool:
+            worker.stop(kill=worker.conn in busy)
+
+
+@click.command()
+@click.option(
+    "-a",
+    "--algorithm",
+    type=click.Choice(list(SEARCHES), case_sensitive=False),
+    default="BFS",
+    show_default=True,
+    help="Select which algorithm to use to solve the puzzles.",
+)
+@click.option(
+    "-e",
+    "--engine",
+    type=click.Choice(["OBJECT", "PACKED", "NUMPY"], case_sensitive=False),
+    default="OBJECT",
+    show_default=True,
+    help="Select how puzzle states are represented whilst searching.",
+)
+@click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=os.cpu_count() or 1,
+    show_default=True,
+    help="Number of puzzles solved at the same time.",
+)
+@click.option(
+    "-t",
+    "--timeout",
+    type=click.FloatRange(min=0),
+    default=None,
+    help="Give up on a puzzle after this many seconds.",
+)
+@click.option(
+    "-o",
+    "--output",
+    type=click.File("w"),
+    default="-",
+    help="Write the results to this file instead of stdout.",
+)
+@click.option(
+    "--cache",
+    type=click.Path(dir_okay=False, resolve_path=True),
+    default=None,
+    help="Reuse and store solutions in this cache file.",
+)
+@click.option(
+    "-v",
+    "--validate",
+    is_flag=True,
+    help="Ensure each puzzle is valid and report an error if not.",
+)
+@click.argument("sources", nargs=-1, required=True)
+def cli(
+    sources=(),
+    algorithm="BFS",
+    engine="OBJECT",
+    workers=1,
+    timeout=None,
+    output=sys.stdout,
+    cache=None,
+    validate=False,
+):
+    """Solve every puzzle in SOURCES writing one JSON line per puzzle.
+
+    SOURCES are directories of json puzzles, text files listing puzzle
+    paths, puzzle files or glob patterns.
+    """
+    if engine == "NUMPY" and algorithm != "BFS":
+        raise click.BadOptionUsage(
+            "engine", "The NUMPY engine can only be used with BFS"
+        )
+    puzzles = find_puzzles(list(sources))
+    if not puzzles:
+        raise click.BadArgumentUsage("No puzzles found in SOURCES")
+    run(
+        puzzles,
+        output,
+        algorithm=algorithm,
+        engine=engine,
+        workers=workers,
+        timeout=timeout,
+        validate=validate,
+        cache=cache,
+    )
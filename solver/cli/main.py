@@ -4,20 +4,93 @@ from typing import Optional
 
 import click
 
-from solver.lib import file2collection
+from solver.lib import file2collection, heuristic
+from solver.lib.cache import SolutionCache, search_tag
+from solver.lib.patterndb import PatternDatabase
 from solver.lib.collection import ContainerCollection
-from solver.lib.search import Option, bfs, dfs
+from solver.lib.search import (
+    Option,
+    SearchStats,
+    anytime,
+    astar,
+    beam,
+    bfs,
+    dfs,
+    idastar,
+)
 
 
 @click.command()
 @click.option(
     "-a",
     "--algorithm",
-    type=click.Choice(["BFS", "DFS"], case_sensitive=False),
+    type=click.Choice(
+        ["BFS", "DFS", "ASTAR", "IDASTAR", "BEAM", "ANYTIME"],
+        case_sensitive=False,
+    ),
     default="BFS",
     show_default=True,
     help="Select which algorithm to use to solve the PUZZLE.",
 )
+@click.option(
+    "-e",
+    "--engine",
+    type=click.Choice(["OBJECT", "PACKED", "NUMPY"], case_sensitive=False),
+    default="OBJECT",
+    show_default=True,
+    help="Select how puzzle states are represented whilst searching.",
+)
+@click.option(
+    "--cache-size",
+    type=click.IntRange(min=1),
+    default=100000,
+    show_default=True,
+    help="Maximum number of states remembered by the IDASTAR search.",
+)
+@click.option(
+    "--beam-width",
+    type=click.IntRange(min=1),
+    default=100,
+    show_default=True,
+    help="Number of states kept at each depth by the BEAM search.",
+)
+@click.option(
+    "--time-limit",
+    type=click.FloatRange(min=0),
+    default=None,
+    help="Stop the ANYTIME search after this many seconds.",
+)
+@click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of processes used by the BFS and ASTAR searches.",
+)
+@click.option(
+    "--pdb",
+    type=click.Path(exists=True, dir_okay=False, resolve_path=True),
+    multiple=True,
+    help="Strengthen the estimate used by informed searches with this "
+    "pattern database, may be given more than once.",
+)
+@click.option(
+    "--partial-order",
+    is_flag=True,
+    help="Only search one order of pours between separate containers.",
+)
+@click.option(
+    "--symmetry",
+    is_flag=True,
+    help="Only search one of the states that differ by a colour renaming.",
+)
+@click.option(
+    "--cache",
+    type=click.Path(dir_okay=False, resolve_path=True),
+    default=None,
+    help="Reuse and store solutions in this cache file.",
+)
 @click.option(
     "-v",
     "--validate",
@@ -33,6 +106,15 @@ from solver.lib.search import Option, bfs, dfs
 def cli(
     puzzle=None,
     algorithm="BFS",
+    engine="OBJECT",
+    cache_size=100000,
+    beam_width=100,
+    time_limit=None,
+    workers=1,
+    pdb=(),
+    partial_order=False,
+    symmetry=False,
+    cache=None,
     verbose=False,
     validate=False,
     prog_name="solver",  # pylint: disable=W0613
@@ -41,6 +123,31 @@ def cli(
 
     PUZZLE is the path to a json file describing the puzzle to solve.
     """
+    if engine == "NUMPY" and algorithm != "BFS":
+        raise click.BadOptionUsage(
+            "engine", "The NUMPY engine can only be used with BFS"
+        )
+    if workers > 1 and (
+        algorithm not in ("BFS", "ASTAR") or engine == "NUMPY"
+    ):
+        raise click.BadOptionUsage(
+            "workers", "Multiple workers can only be used with BFS or ASTAR"
+        )
+    if symmetry and (engine == "NUMPY" or workers > 1):
+        raise click.BadOptionUsage(
+            "symmetry",
+            "Symmetry can't be used with the NUMPY engine or multiple workers",
+        )
+    if partial_order and (engine == "NUMPY" or workers > 1):
+        raise click.BadOptionUsage(
+            "partial_order",
+            "Partial order reduction can't be used with the NUMPY engine or "
+            "multiple workers",
+        )
+    if pdb and algorithm in ("BFS", "DFS"):
+        raise click.BadOptionUsage(
+            "pdb", "Pattern databases can't be used with BFS or DFS"
+        )
     if verbose:
         logging.basicConfig(
             format="%(levelname)s: %(message)s", level=logging.DEBUG
@@ -56,12 +163,121 @@ def cli(
     print(start, "\n")
 
     result: Optional[Option] = None
-    if algorithm == "BFS":
+    stats = SearchStats()
+    packed = engine == "PACKED"
+    estimate: heuristic.Heuristic = heuristic.estimate
+    if pdb:
+        databases = [PatternDatabase(path) for path in pdb]
+        for database in databases:
+            if database.containers != len(start.data) or any(
+                container.capacity != database.capacity
+                for container in start.data
+            ):
+                raise click.BadOptionUsage(
+                    "pdb",
+                    f"Pattern database {database.path} was built for "
+                    f"{database.containers} containers of "
+                    f"{database.capacity} items",
+                )
+        estimate = heuristic.Strongest(heuristic.estimate, *databases)
+    tag = search_tag(algorithm, width=beam_width, time_limit=time_limit)
+    solutions = None
+    if cache is not None and tag is not None:
+        solutions = SolutionCache(cache)
+        result = solutions.get(start, tag)
+    cached = result is not None
+    if cached:
+        print("Found a solution in the cache\n")
+    elif algorithm == "BFS":
         print("Searching using Breadth-First Search\n")
-        result = bfs(start)
+        if engine == "NUMPY":
+            from solver.lib import vectorised  # pylint: disable=C0415
+
+            result = vectorised.bfs(start, stats)
+        elif workers > 1:
+            from solver.lib import parallel  # pylint: disable=C0415
+
+            result = parallel.bfs(start, stats, workers=workers)
+        else:
+            result = bfs(
+                start,
+                stats,
+                packed=packed,
+                symmetry=symmetry,
+                reduction=partial_order,
+            )
     elif algorithm == "DFS":
         print("Searching using Depth-First Search\n")
-        result = dfs(start)
+        result = dfs(
+            start,
+            stats,
+            packed=packed,
+            symmetry=symmetry,
+            reduction=partial_order,
+        )
+    elif algorithm == "ASTAR":
+        print("Searching using A* Search\n")
+        if workers > 1:
+            from solver.lib import parallel  # pylint: disable=C0415
+
+            result = parallel.astar(
+                start, stats, workers=workers, estimate=estimate
+            )
+        else:
+            result = astar(
+                start,
+                stats,
+                packed=packed,
+                symmetry=symmetry,
+                reduction=partial_order,
+                estimate=estimate,
+            )
+    elif algorithm == "IDASTAR":
+        print("Searching using Iterative Deepening A* Search\n")
+        result = idastar(
+            start,
+            stats,
+            packed=packed,
+            symmetry=symmetry,
+            reduction=partial_order,
+            estimate=estimate,
+            cache_size=cache_size,
+        )
+    elif algorithm == "BEAM":
+        print("Searching using Beam Search\n")
+        result = beam(
+            start,
+            stats,
+            packed=packed,
+            symmetry=symmetry,
+            reduction=partial_order,
+            estimate=estimate,
+            width=beam_width,
+        )
+    elif algorithm == "ANYTIME":
+        print("Searching using Anytime Weighted A* Search\n")
+        for result in anytime(
+            start,
+            stats,
+            packed=packed,
+            symmetry=symmetry,
+            reduction=partial_order,
+            estimate=estimate,
+            time_limit=time_limit,
+        ):
+            print("found a solution in", len(result.moves), "moves")
+    if stats.unsolvable is not None:
+        print("Ruled out without searching as", stats.unsolvable, "\n")
+    logging.info(
+        f"expanded {stats.expanded} states, "
+        f"pruned {stats.duplicates} duplicates, "
+        f"found {stats.pour_hit_rate:.1%} of pours in the cache"
+    )
+
+    if solutions is not None:
+        if result is not None and not cached:
+            solutions.put(start, result, tag)
+        solutions.close()
 
     if result is None:
         print("Cannot be solved :(")
@@ -0,0 +1,57 @@
+"""Entry point for building pattern databases."""
+import time
+
+import click
+
+from solver.lib import file2collection, patterndb
+
+
+@click.command()
+@click.option(
+    "-c",
+    "--colour",
+    "colours",
+    multiple=True,
+    help="A pattern colour, may be given more than once.",
+)
+@click.option(
+    "-k",
+    "--count",
+    type=click.IntRange(min=1),
+    default=2,
+    show_default=True,
+    help="Use the first COUNT colours of PUZZLE when none are given.",
+)
+@click.option(
+    "--max-states",
+    type=click.IntRange(min=1),
+    default=2000000,
+    show_default=True,
+    help="Give up if the abstraction has more states than this.",
+)
+@click.argument("puzzle", type=click.Path(exists=True, resolve_path=True))
+@click.argument("output", type=click.File("wb"))
+def cli(puzzle=None, output=None, colours=(), count=2, max_states=2000000):
+    """Build a pattern database for PUZZLE and write it to OUTPUT.
+
+    Use the database when solving with `solver --pdb OUTPUT`.
+    """
+    start = file2collection.load(puzzle, reject_invalid=False)
+    colours = [colour.upper() for colour in colours]
+    if not colours:
+        for container in start.data:
+            for item in container.data:
+                name = item.colour.name
+                if name not in colours and len(colours) < count:
+                    colours.append(name)
+
+    began = time.perf_counter()
+    try:
+        keys, distances = patterndb.build(start, colours, max_states)
+    except ValueError as err:
+        raise click.ClickException(str(err))
+    patterndb.write(output, start, colours, keys, distances)
+    print(
+        f"Wrote {len(keys)} states for {', '.join(colours)} "
+        f"in {time.perf_counter() - began:.2f}s"
+    )
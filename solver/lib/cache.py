@@ -0,0 +1,181 @@
+"""A persistent cache of solutions keyed by a canonical form of the puzzle.
+
+The cache stores the moves against a canonical ordering of the containers
+and maps them back to the caller's container indices on the way out.
+"""
+import hashlib
+import json
+import sqlite3
+from typing import Callable, List, Optional, Tuple
+
+from solver.lib.collection import ContainerCollection
+from solver.lib.move import Move
+from solver.lib.search import Option
+from solver.lib.symmetry import canonical_form
+
+Search = Callable[..., Optional[Option]]
+
+
+def canonical(collection: ContainerCollection) -> Tuple[str, List[int]]:
+    """Get a canonical hash of `collection` and the order of its containers.
+
+    The hash is of the `symmetry.canonical_form` of the collection and the
+    order gives the index in `collection` of each container in its
+    canonical position.
+    """
+    order, form = canonical_form(
+        [
+            (container.capacity, container.codes)
+            for container in collection.data
+        ]
+    )
+    content = json.dumps(form)
+    return hashlib.sha256(content.encode()).hexdigest(), order
+
+
+def search_tag(
+    algorithm: str, width: int = 100, time_limit: Optional[float] = None
+) -> Optional[str]:
+    """Get the tag to store the solutions found by `algorithm` under.
+
+    The solution of a BEAM search depends on its `width`, so the width is
+    part of its tag. An ANYTIME search stopped by a `time_limit` may not
+    have found its shortest solution, so None is returned as it shouldn't
+    be cached.
+    """
+    if algorithm == "BEAM":
+        return f"BEAM:{width}"
+    if algorithm == "ANYTIME" and time_limit is not None:
+        return None
+    return algorithm
+
+
+class SolutionCache:
+    """Solutions stored in a sqlite database at `path`.
+
+    Once the stored solutions take up more than `max_size` bytes the least
+    recently used are removed.
+    """
+
+    def __init__(self, path: str, max_size: int = 64 * 1024 * 1024):
+        """Open, or create, the cache stored at `path`."""
+        self.max_size = max_size
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS solutions ("
+            "key TEXT PRIMARY KEY, moves TEXT NOT NULL, "
+            "size INTEGER NOT NULL, used INTEGER NOT NULL)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS solutions_used ON solutions (used)"
+        )
+        self.connection.commit()
+
+    def __enter__(self):
+        """Use the cache as a context manager."""
+        return self
+
+    def __exit__(self, *args):
+        """Close the cache."""
+        self.close()
+
+    def close(self):
+        """Close the underlying database."""
+        self.connection.close()
+
+    def _next_use(self) -> int:
+        """Get a counter value later than every recorded use."""
+        (used,) = self.connection.execute(
+            "SELECT COALESCE(MAX(used), 0) + 1 FROM solutions"
+        ).fetchone()
+        return used
+
+    @staticmethod
+    def _key(collection: ContainerCollection, tag: str) -> Tuple[str, List]:
+        """Get the key for `collection` solved by `tag`."""
+        key, order = canonical(collection)
+        return f"{tag}:{key}", order
+
+    def get(
+        self, collection: ContainerCollection, tag: str = ""
+    ) -> Optional[Option]:
+        """Get the cached solution to `collection`, if there is one.
+
+        The `tag` keeps solutions from different searches apart, for
+        example so a DFS solution isn't returned when a shortest one is
+        wanted.
+        """
+        key, order = self._key(collection, tag)
+        row = self.connection.execute(
+            "SELECT moves FROM solutions WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self.connection.execute(
+            "UPDATE solutions SET used = ? WHERE key = ?",
+            (self._next_use(), key),
+        )
+        self.connection.commit()
+        moves = tuple(
+            Move(order[src], order[dest]) for src, dest in json.loads(row[0])
+        )
+        solved = collection
+        for move in moves:
+            solved = solved.after(move)
+        return Option(solved, moves)
+
+    def put(
+        self, collection: ContainerCollection, option: Option, tag: str = ""
+    ):
+        """Store `option` as the solution to `collection`."""
+        key, order = self._key(collection, tag)
+        position = {idx: pos for pos, idx in enumerate(order)}
+        moves = json.dumps(
+            [
+                [position[move.src], position[move.dest]]
+                for move in option.moves
+            ]
+        )
+        size = len(key) + len(moves)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?)",
+            (key, moves, size, self._next_use()),
+        )
+        self._evict()
+        self.connection.commit()
+
+    def _evict(self):
+        """Remove the least recently used solutions until under size."""
+        (total,) = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM solutions"
+        ).fetchone()
+        if total <= self.max_size:
+            return
+        rows = self.connection.execute(
+            "SELECT key, size FROM solutions ORDER BY used"
+        ).fetchall()
+        expired = []
+        for key, size in rows:
+            if total <= self.max_size:
+                break
+            expired.append((key,))
+            total -= size
+        self.connection.executemany(
+            "DELETE FROM solutions WHERE key = ?", expired
+        )
+
+    def solve(
+        self,
+        collection: ContainerCollection,
+        search: Search,
+        *args,
+        tag: str = "",
+        **kwargs,
+    ) -> Optional[Option]:
+        """Get the solution from the cache or from `search` if missing."""
+        result = self.get(collection, tag)
+        if result is None:
+            result = search(collection, *args, **kwargs)
+            if result is not None:
+                self.put(collection, result, tag)
+        return result
@@ -1,9 +1,157 @@
 """Collection module."""
 from __future__ import annotations
-from typing import Union, List, Optional
+import operator
+from collections import Counter, OrderedDict
+from typing import Any, FrozenSet, Iterable, List, Optional, Tuple, Union
 
+from solver.lib import zobrist
 from solver.lib.move import Move
-from solver.lib.container import Container
+from solver.lib.container import Container, intern
+from solver.lib.symmetry import Form, canonical_form
+
+# The exact canonical state is the multiset of container signatures, the
+# capacity and contents of each, stored as the pairs of (signature, number
+# of containers with that signature).
+Contents = FrozenSet[Tuple[Tuple[int, bytes], int]]
+
+
+def _state_key(containers: Iterable[Container]) -> Contents:
+    """Build the exact canonical contents of `containers`."""
+    return frozenset(
+        Counter(container.signature for container in containers).items()
+    )
+
+
+_by_zobrist = operator.attrgetter("zobrist")
+
+
+class StateKey:
+    """A hashable key for the state of a collection.
+
+    The key hashes to the collection's Zobrist hash, which is updated per
+    move, so adding a key to a transposition table costs the same however
+    large the collection is. The contents are only compared when two keys
+    share a hash.
+    """
+
+    __slots__ = ("zobrist", "containers")
+
+    def __init__(self, value: int, containers: Tuple[Container, ...]):
+        """Create the key of `containers` whose Zobrist hash is `value`."""
+        self.zobrist = value
+        self.containers = containers
+
+    @property
+    def contents(self) -> Contents:
+        """Get the multiset of container contents."""
+        return _state_key(self.containers)
+
+    def __eq__(self, other: object) -> bool:
+        """Check if the same containers are held, ignoring order."""
+        if not isinstance(other, StateKey) or self.zobrist != other.zobrist:
+            return False
+        if self is other:
+            return True
+        # Pair up the containers by their hashes first, which usually pairs
+        # the containers that match
+        mine = sorted(self.containers, key=_by_zobrist)
+        theirs = sorted(other.containers, key=_by_zobrist)
+        if all(a.signature == b.signature for a, b in zip(mine, theirs)):
+            return len(mine) == len(theirs)
+        # Containers sharing a hash may have been paired up wrongly
+        return self.contents == other.contents
+
+    def __hash__(self) -> int:
+        """Get the Zobrist hash of the state."""
+        return self.zobrist
+
+
+# The containers left by a pour, or None if it isn't a valid move
+Outcome = Optional[Tuple[Container, Container]]
+
+
+def _pour(src: Container, dest: Container) -> Outcome:
+    """Work out the containers left by pouring `src` into `dest`."""
+    # Ensure it's a pratical move
+    if dest.is_full or src.is_empty:
+        return None
+
+    # Don't allow needless movement between containers
+    if src.is_unique and dest.is_empty:
+        return None
+
+    # This tests the top most colour matches.
+    # If it does, also check there's enough capacity for the pour.
+    # Don't try to put more into a container than it could take
+    dest_space = dest.capacity - len(dest)
+    if (
+        not (dest.is_empty or dest.codes[-1] == src.codes[-1])
+        or src.num_matching_head > dest_space
+    ):
+        return None
+    # Identical contents in other states share one container
+    src, dest = src.poured(dest)
+    return intern(src), intern(dest)
+
+
+class PourCache:
+    """A bounded cache of the outcomes of pouring between two contents.
+
+    A pour only depends on what the two containers hold, so one cache is
+    shared by every state made from the same collection, and each search
+    gives the collection it starts from a new cache. Move generation and
+    `after` look pours up by the contents of the containers and only work
+    out the ones that haven't been seen recently. Once the cache holds
+    `max_size` outcomes the least recently used is dropped.
+    """
+
+    def __init__(self, max_size: int = 100000, stats: Any = None):
+        """Create an empty cache of at most `max_size` outcomes.
+
+        The hits and misses are also added to the `pour_hits` and
+        `pour_misses` of `stats`, such as a `search.SearchStats`, if given.
+        """
+        self.max_size = max_size
+        self.stats = stats
+        self.hits = 0
+        self.misses = 0
+        self.__outcomes: OrderedDict[
+            Tuple[Tuple[int, bytes], Tuple[int, bytes]], Outcome
+        ] = OrderedDict()
+
+    def get(self, src: Container, dest: Container) -> Outcome:
+        """Get the outcome of pouring `src` into `dest`."""
+        key = (src.signature, dest.signature)
+        outcome = self.__outcomes.get(key, self)
+        if outcome is not self:
+            self.hits += 1
+            if self.stats is not None:
+                self.stats.pour_hits += 1
+            self.__outcomes.move_to_end(key)
+            return outcome  # type: ignore
+        self.misses += 1
+        if self.stats is not None:
+            self.stats.pour_misses += 1
+        outcome = self.__outcomes[key] = _pour(src, dest)
+        if len(self.__outcomes) > self.max_size:
+            self.__outcomes.popitem(last=False)
+        return outcome
+
+    @property
+    def hit_rate(self) -> float:
+        """Get the fraction of pours that were found in the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        """Remove every outcome and reset the counts."""
+        self.__outcomes.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        """Get the number of outcomes held."""
+        return len(self.__outcomes)
 
 
 class ContainerCollection:
@@ -11,21 +159,72 @@ class ContainerCollection:
 
     def __init__(
         self,
-        data: Union[ContainerCollection, List[Container], List[List[str]]],
+        data: Union[
+            ContainerCollection,
+            List[Container],
+            List[List[str]],
+            Tuple[Container, ...],
+        ],
     ):
-        """Construct a new collection from `data`."""
-        self.__unique_set: Optional[set] = None
+        """Construct a new collection from `data`.
+
+        The containers of a collection may be shared with other collections
+        so they are all frozen. A tuple of containers is shared with the new
+        collection rather than copied, so those containers are frozen too.
+        """
+        self.__key: Optional[StateKey] = None
+        self.__zobrist: Optional[int] = None
+        self.__symmetric_key: Optional[Form] = None
         self.__possible_moves: Optional[List[Move]] = None
-        if isinstance(data, list):
-            self.data = tuple(Container(item) for item in data)
+        self.__pours: Optional[PourCache] = None
+        if isinstance(data, tuple):
+            if not all(isinstance(item, Container) for item in data):
+                raise TypeError(
+                    "A tuple used to construct ContainerCollection must "
+                    "only hold Containers."
+                )
+            self.data = tuple(container.freeze() for container in data)
+        elif isinstance(data, list):
+            self.data = tuple(Container(item).freeze() for item in data)
         elif isinstance(data, ContainerCollection):
-            self.data = tuple(container.copy() for container in data.data)
+            self.data = tuple(
+                container.copy().freeze() for container in data.data
+            )
         else:
             raise TypeError(
                 f"Invalid type ({data.__class__.__name__}) "
                 "used to construct ContainerCollection."
             )
 
+    @classmethod
+    def __shared(
+        cls, data: Tuple[Container, ...], pours: PourCache
+    ) -> ContainerCollection:
+        """Create a collection of `data`, which are all already frozen.
+
+        This skips checking and freezing each container, so making a move
+        doesn't cost more for collections with more containers.
+        """
+        collection = cls.__new__(cls)
+        collection.__key = None
+        collection.__zobrist = None
+        collection.__symmetric_key = None
+        collection.__possible_moves = None
+        collection.__pours = pours
+        collection.data = data
+        return collection
+
+    @property
+    def pours(self) -> PourCache:
+        """Get the cache of pours shared with the states made from this."""
+        if self.__pours is None:
+            self.__pours = PourCache()
+        return self.__pours
+
+    def with_pours(self, pours: PourCache) -> ContainerCollection:
+        """Get a collection of the same containers that uses `pours`."""
+        return ContainerCollection.__shared(self.data, pours)
+
     @property
     def is_solved(self) -> bool:
         """Check if all containers are solved."""
@@ -45,12 +244,14 @@ class ContainerCollection:
         if self.__possible_moves is not None:
             return self.__possible_moves
         moves: List[Move] = []
+        data = self.data
+        pour = self.pours.get
         for x in range(len(self)):
             # Skip fully solved containers
             if (
-                self.data[x].is_solved
-                or self.data[x].is_empty
-                or (self.data[x].is_unique and len(self.data[x]) > 2)
+                data[x].is_solved
+                or data[x].is_empty
+                or (data[x].is_unique and len(data[x]) > 2)
             ):
                 continue
             used_in_empty = False
@@ -59,7 +260,7 @@ class ContainerCollection:
                     continue
                 move = Move(x, y)
                 # check if this is a possible move
-                if not self.is_valid(move):
+                if pour(data[x], data[y]) is None:
                     continue
                 if used_in_empty and self.data[move.dest].is_empty:
                     continue
@@ -71,35 +272,34 @@ class ContainerCollection:
 
     def is_valid(self, move: Move) -> bool:
         """Check if a move is valid for this collection."""
-        # Ensure it's a pratical move
-        if (
-            move.src == move.dest
-            or self.data[move.dest].is_full
-            or self.data[move.src].is_empty
-        ):
-            return False
-        src = self.data[move.src]
-        dest = self.data[move.dest]
-
-        # Don't allow needless movement between containers
-        if src.is_unique and dest.is_empty:
-            return False
-
-        # This tests the top most colour matches.
-        # If it does, also check there's enough capacity for the pour.
-        # Don't try to put more into a container than it could take
-        dest_space = dest.capacity - len(dest)
         return (
-            self.data[move.dest].test(self.data[move.src].head)
-            and src.num_matching_head <= dest_space
+            move.src != move.dest
+            and self.pours.get(self.data[move.src], self.data[move.dest])
+            is not None
         )
 
     def after(self, move: Move) -> ContainerCollection:
-        """Get a new collection with `move` having been made."""
-        if not self.is_valid(move):
+        """Get a new collection with `move` having been made.
+
+        The new collection shares every container except the two that
+        `move` pours between with this one, and those two are shared with
+        any other states holding the same contents.
+        """
+        outcome = None
+        if move.src != move.dest:
+            outcome = self.pours.get(self.data[move.src], self.data[move.dest])
+        if outcome is None:
             raise ValueError("Invalid move", move)
-        _next = ContainerCollection(self)
-        _next.data[move.src].pour(_next.data[move.dest])
+        # Only the two containers poured between change, the rest are shared
+        src, dest = outcome
+        data = list(self.data)
+        data[move.src], data[move.dest] = src, dest
+        _next = ContainerCollection.__shared(tuple(data), self.pours)
+        _next.__zobrist = zobrist.replace(
+            self.zobrist,
+            (self.data[move.src].zobrist, self.data[move.dest].zobrist),
+            (src.zobrist, dest.zobrist),
+        )
         return _next
 
     def __getitem__(self, x):
@@ -110,17 +310,53 @@ class ContainerCollection:
         """Get the number of containers in the collection."""
         return len(self.data)
 
-    def _unique_set(self):
-        """Get the set representing the unique containers in the collection.
+    @property
+    def zobrist(self) -> int:
+        """Get the Zobrist hash of the state of this collection.
+
+        Like `key` this ignores the order of the containers. Collections
+        made by `after` update the hash of their parent rather than hashing
+        every container again.
+        """
+        if self.__zobrist is None:
+            self.__zobrist = zobrist.combine(
+                container.zobrist for container in self.data
+            )
+        return self.__zobrist
+
+    @property
+    def key(self) -> StateKey:
+        """Get the canonical, hashable key for the state of this collection.
 
-        This set is cached to improve performance of comparing collections
+        The key compares the multiset of container capacities and contents:
+        it ignores the order of the containers but, unlike a plain set,
+        still counts duplicate containers (such as several empty ones). It
+        hashes to `zobrist`.
+        This key is cached to improve performance of comparing collections
         during the solving process and therefore is not guaranteed to be
         representative of the collection if container is directly modified
         rather than using the `after` method.
         """
-        if self.__unique_set is None:
-            self.__unique_set = set(container.data for container in self.data)
-        return self.__unique_set
+        if self.__key is None:
+            self.__key = StateKey(self.zobrist, self.data)
+        return self.__key
+
+    @property
+    def symmetric_key(self) -> Form:
+        """Get a key that also ignores which colour is which.
+
+        Collections that only differ by swapping every item of one colour
+        for another have the same solutions, so searches can treat them as
+        the same state. Like `key` this is cached.
+        """
+        if self.__symmetric_key is None:
+            _, self.__symmetric_key = canonical_form(
+                [
+                    (container.capacity, container.codes)
+                    for container in self.data
+                ]
+            )
+        return self.__symmetric_key
 
     def __eq__(self, other: object) -> bool:
         """Check if this collection is the same as `other`.
@@ -131,13 +367,15 @@ class ContainerCollection:
         be correct.
         """
         if isinstance(other, ContainerCollection):
-            return self._unique_set() == other._unique_set()
+            return self.key == other.key
         if isinstance(other, list):
-            return self._unique_set() == set(
-                container.data for container in other
-            )
+            return self.key.contents == _state_key(other)
         return False
 
+    def __hash__(self) -> int:
+        """Get the hash of this collection's canonical key."""
+        return hash(self.key)
+
     def __ne__(self, other: object) -> bool:
         """Check if this collection is different to `other`."""
         return not self.__eq__(other)
@@ -1,28 +1,40 @@
-"""Colours for use in the game."""
+"""Colours for use in the game.
+
+The value of each colour is the ANSI escape sequence that sets a terminal's
+foreground to it. They are written out here, rather than built with a
+terminal styling library, so that loading puzzles doesn't pay for it.
+"""
 from enum import Enum
-from sty import fg, Style, RgbFg
 
-fg.li_green = Style(RgbFg(153, 255, 153))
-fg.li_blue = Style(RgbFg(102, 255, 255))
-fg.green = Style(RgbFg(102, 153, 0))
-fg.brown = Style(RgbFg(110, 79, 43))
-fg.orange = Style(RgbFg(255, 150, 50))
-fg.pink = Style(RgbFg(255, 153, 204))
+
+def _basic(code: int) -> str:
+    """Get the sequence for one of the eight basic terminal colours."""
+    return f"\x1b[{code}m"
+
+
+def _palette(idx: int) -> str:
+    """Get the sequence for colour `idx` of the 256 colour palette."""
+    return f"\x1b[38;5;{idx}m"
+
+
+def _rgb(red: int, green: int, blue: int) -> str:
+    """Get the sequence for a 24-bit colour."""
+    return f"\x1b[38;2;{red};{green};{blue}m"
 
 
 class Colour(Enum):
     """Colours that can be used."""
 
-    RED = fg.red
-    PINK = fg.pink
-    BROWN = fg.brown
-    GREEN = fg.green
-    LIGHT_GREEN = fg.li_green
-    DARK_GREEN = fg.da_green
-    YELLOW = fg.yellow
-    BLUE = fg.blue
-    LIGHT_BLUE = fg.li_blue
-    DARK_BLUE = fg.da_blue
-    GREY = fg(245)
-    PURPLE = fg(93)
-    ORANGE = fg.orange
+    RED = _basic(31)
+    PINK = _rgb(255, 153, 204)
+    BROWN = _rgb(110, 79, 43)
+    GREEN = _rgb(102, 153, 0)
+    LIGHT_GREEN = _rgb(153, 255, 153)
+    DARK_GREEN = _palette(22)
+    YELLOW = _basic(33)
+    BLUE = _basic(34)
+    LIGHT_BLUE = _rgb(102, 255, 255)
+    DARK_BLUE = _palette(18)
+    GREY = _palette(245)
+    PURPLE = _palette(93)
+    ORANGE = _rgb(255, 150, 50)
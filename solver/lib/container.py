@@ -1,9 +1,11 @@
 """A container is a vessle with a limited capacity that holds items."""
 from __future__ import annotations
 import collections.abc
-from typing import cast, Any, Optional, Sequence, Tuple, Union
+import weakref
+from typing import Any, Optional, Sequence, Tuple, Union
 
-from solver.lib.item import Item
+from solver.lib import zobrist
+from solver.lib.item import Item, from_code, to_code
 
 
 class Container:
@@ -17,54 +19,80 @@ class Container:
         """Create a container with `intial_content` and `capacity`."""
         self._capacity = capacity or 4
         # Ensure this is only ever set to the maximum size
-        self.__data: Tuple[Item, ...]
+        self.__codes: bytes
         if isinstance(initial_content, Container):
             self._capacity = capacity or initial_content.capacity
-            self.__data = initial_content.data[:capacity]
+            self.__codes = initial_content.codes[:capacity]
         else:
             type_map = set(map(type, iter(initial_content)))
-            if type_map == {Item}:
-                initial_content = cast(
-                    Sequence[Item], initial_content[:capacity]
-                )
-                self.__data = tuple(initial_content)
-            elif type_map == {str}:
-                initial_content = cast(
-                    Sequence[str], initial_content[:capacity]
-                )
-                self.__data = tuple(
-                    Item(value) for value in initial_content[:capacity]
+            if type_map == {Item} or type_map == {str}:
+                self.__codes = bytes(
+                    to_code(value) for value in initial_content[:capacity]
                 )
             elif type_map == set():
-                self.__data = tuple()
+                self.__codes = bytes()
             else:
                 raise TypeError(
                     f"Unknown initaliser: {initial_content.__class__.__name__}"
                     f": {type_map.__repr__()}"
                 )
 
-        # Setup the number of matching items at the head of the container
-        data_len = len(self.__data)
-        if data_len != 0:
-            self.__num_matching_head = 1
+        self.__signature = (self._capacity, self.__codes)
+
+        # Whole copies keep the hash of the original rather than rehashing
+        source = initial_content
+        if isinstance(source, Container) and len(source) == len(self.__codes):
+            self.__zobrist = source.zobrist
         else:
-            self.__num_matching_head = 0
-
-        # if there is more than one item, loop backward through the items
-        # counting how many match the head item, break the loop at the
-        # first non-matching item.
-        if data_len > 1:
-            head = self.__data[-1]
-            for item in reversed(self.__data[:-1]):
-                if item == head:
-                    self.__num_matching_head += 1
-                else:
-                    break
+            self.__zobrist = zobrist.container(self.__codes)
+
+        self.__solved: Optional[bool] = None
+        self.__frozen = False
+
+        # Setup the number of matching items at the head of the container
+        self.__num_matching_head = self.__count_head()
+
+    @classmethod
+    def __create(
+        cls, capacity: int, codes: bytes, value: int, run: int
+    ) -> Container:
+        """Create a container from parts already worked out.
+
+        `value` is the Zobrist hash of `codes` and `run` is the number of
+        items matching the head, or 0 to count them.
+        """
+        container = cls.__new__(cls)
+        container._capacity = capacity
+        container.__codes = codes
+        container.__signature = (capacity, codes)
+        container.__zobrist = value
+        container.__solved = None
+        container.__frozen = False
+        container.__num_matching_head = run or container.__count_head()
+        return container
+
+    def __count_head(self) -> int:
+        """Count the items at the head that match it."""
+        codes = self.__codes
+        return len(codes) - len(codes.rstrip(codes[-1:]))
 
     @property
     def data(self) -> Tuple[Item, ...]:
         """Non-settable public exposure of the internal data."""
-        return self.__data
+        return tuple(from_code(code) for code in self.__codes)
+
+    @property
+    def codes(self) -> bytes:
+        """Get the colour code of each item, see `solver.lib.item`."""
+        return self.__codes
+
+    @property
+    def signature(self) -> Tuple[int, bytes]:
+        """Get the capacity and codes, which together say what this holds.
+
+        Containers with the same signature behave the same in every move.
+        """
+        return self.__signature
 
     @property
     def capacity(self) -> int:
@@ -77,7 +105,7 @@ class Container:
 
         Returns true if the container is empty.
         """
-        return len(self.__data) == 0
+        return len(self.__codes) == 0
 
     @property
     def is_full(self) -> bool:
@@ -85,7 +113,7 @@ class Container:
 
         Returns true if the container contains it's maximum number of items.
         """
-        return len(self.__data) >= self.capacity
+        return len(self.__codes) >= self.capacity
 
     @property
     def is_unique(self) -> bool:
@@ -93,9 +121,7 @@ class Container:
 
         Returns true if empty or all contents are the same colour.
         """
-        if len(self.__data) == 0:
-            return True
-        return len(set(self.__data)) == 1
+        return self.__num_matching_head == len(self.__codes)
 
     @property
     def is_solved(self) -> bool:
@@ -103,14 +129,16 @@ class Container:
 
         Returns true if empty or full and all contents are the same colour.
         """
-        return self.is_empty or (self.is_unique and self.is_full)
+        if self.__solved is None:
+            self.__solved = self.is_empty or (self.is_unique and self.is_full)
+        return self.__solved
 
     @property
     def head(self) -> Optional[Item]:
         """Get the top most item in the container or None if empty."""
         if self.is_empty:
             return None
-        return self.__data[-1]
+        return from_code(self.__codes[-1])
 
     @property
     def num_matching_head(self) -> int:
@@ -121,11 +149,37 @@ class Container:
         """
         return self.__num_matching_head
 
+    @property
+    def zobrist(self) -> int:
+        """Get the Zobrist hash of the items in this container.
+
+        The hash is kept up to date as items are added and poured out, see
+        `solver.lib.zobrist`.
+        """
+        return self.__zobrist
+
+    @property
+    def frozen(self) -> bool:
+        """Check if this container can no longer be changed."""
+        return self.__frozen
+
+    def freeze(self) -> Container:
+        """Stop this container from being changed and return it.
+
+        Containers are frozen once they belong to a collection, as they may
+        then be shared with other collections. Use `copy` to get a copy
+        that can be changed.
+        """
+        self.__frozen = True
+        return self
+
     def test(self, item: Optional[Item]) -> bool:
         """Check if `item` can be put in this container."""
-        if self.is_full or (not self.is_empty and self.__data[-1] != item):
+        if self.is_full:
             return False
-        return True
+        if self.is_empty:
+            return True
+        return item is not None and self.__codes[-1] == to_code(item)
 
     def pour(self, target: Container) -> bool:
         """Move the head item from this container to target container.
@@ -134,63 +188,104 @@ class Container:
         fit within `target` over to it.
 
         Returns a bool indicating if any items were successfully moved.
+        Raises a `TypeError` if either container is frozen.
         """
-        head = self.head
-        if head is None:
+        if self.__frozen or target.frozen:
+            raise TypeError("Can't change a frozen container")
+        if self.is_empty or not target.test(self.head):
             return False
-        if not target.test(head):
-            return False
-        # Remove the last item from data and add it to target
-        self.__data = self.__data[:-1]
-        target.add(head)
-        self.__num_matching_head -= 1
-        # Check for matching colours left at head and keep repeating
-        # until all have been moved or target is full
-        while self.head is not None and self.head == head:
-            if target.is_full:
-                break
-            self.__data = self.__data[:-1]
-            target.add(head)
-            self.__num_matching_head -= 1
-        if self.__num_matching_head == 0 and not self.is_empty:
-            # There is a new head colour and we need to re-compute the number
-            # of matching items by looping backward through the items
-            self.__num_matching_head = 1
-            for item in reversed(self.__data[:-1]):
-                if item == self.head:
-                    self.__num_matching_head += 1
-                else:
-                    break
+        head = self.__codes[-1]
+        amount = min(
+            self.__num_matching_head, target.capacity - len(target.codes)
+        )
+        length = len(self.__codes)
+        for height in range(length - amount, length):
+            self.__zobrist ^= zobrist.piece(height, head)
+        self.__codes = self.__codes[:-amount]
+        self.__signature = (self._capacity, self.__codes)
+        self.__solved = None
+        self.__num_matching_head -= amount
+        if self.__num_matching_head == 0:
+            # There may be a new head colour with its own run of items
+            self.__num_matching_head = self.__count_head()
+        target.__extend(head, amount)
         return True
 
+    def poured(self, target: Container) -> Tuple[Container, Container]:
+        """Get new copies of this container and `target` after a pour.
+
+        The copies hold what `pour` would leave in each, but are built
+        directly with their hashes and head runs updated rather than
+        copied and then changed. Neither container is modified.
+
+        Raises a `ValueError` if nothing can be poured into `target`.
+        """
+        codes, dest_codes = self.__codes, target.__codes
+        if (
+            not codes
+            or len(dest_codes) >= target.capacity
+            or (dest_codes and dest_codes[-1] != codes[-1])
+        ):
+            raise ValueError("Can't pour into target")
+        head = codes[-1]
+        length, dest_length = len(codes), len(dest_codes)
+        amount = min(self.__num_matching_head, target.capacity - dest_length)
+        value, dest_value = self.__zobrist, target.__zobrist
+        for offset in range(amount):
+            value ^= zobrist.piece(length - 1 - offset, head)
+            dest_value ^= zobrist.piece(dest_length + offset, head)
+        return (
+            self.__create(
+                self._capacity,
+                codes[:-amount],
+                value,
+                self.__num_matching_head - amount,
+            ),
+            self.__create(
+                target.capacity,
+                dest_codes + bytes((head,)) * amount,
+                dest_value,
+                target.__num_matching_head + amount,
+            ),
+        )
+
     def add(self, item: Item) -> bool:
         """Add `item` to this collection.
 
         Returns a boolean indiciating success.
+        Raises a `TypeError` if this container is frozen.
         """
+        if self.__frozen:
+            raise TypeError("Can't change a frozen container")
         if not self.test(item):
             return False
-        # Convert data to a list and then back to a tuple to change it
-        data = list(self.__data)
-        data.append(item)
-        self.__num_matching_head += 1
-        self.__data = tuple(data)
+        self.__extend(to_code(item), 1)
         return True
 
+    def __extend(self, code: int, amount: int):
+        """Put `amount` items of colour `code` on top of this container."""
+        length = len(self.__codes)
+        for height in range(length, length + amount):
+            self.__zobrist ^= zobrist.piece(height, code)
+        self.__codes += bytes((code,)) * amount
+        self.__signature = (self._capacity, self.__codes)
+        self.__solved = None
+        self.__num_matching_head += amount
+
     def copy(self) -> Container:
         """Create a new container with the same data.
 
-        The new container can be mutated using the `add` function
-        without affecting the original container.
+        The new container isn't frozen and can be mutated using the `add`
+        function without affecting the original container.
         """
         return Container(self)
 
     def __eq__(self, other: Any) -> bool:
         """Check if this container is equal to other."""
         if isinstance(other, Container):
-            return self.__data == other.data
+            return self.__codes == other.codes
         if isinstance(other, collections.abc.Sequence):
-            return self.__data == tuple(other)
+            return self.data == tuple(other)
         return False
 
     def __ne__(self, other: Any) -> bool:
@@ -199,7 +294,7 @@ class Container:
 
     def __str__(self) -> str:
         """Get the string representation of this container."""
-        content = [str(content) for content in self.__data]
+        content = [str(content) for content in self.data]
         padding = ""
         if len(content) < self.capacity:
             padding = " " * (self.capacity - len(self))
@@ -207,15 +302,15 @@ class Container:
 
     def __repr__(self) -> str:
         """Get a representation of the container."""
-        return f"[{','.join(item.__repr__() for item in self.__data)}]"
+        return f"[{','.join(item.__repr__() for item in self.data)}]"
 
     def __len__(self) -> int:
         """Return the number of items contained."""
-        return len(self.__data)
+        return len(self.__codes)
 
     def __getitem__(self, idx):
         """Get the `item` at `index`."""
-        return self.__data.__getitem__(idx)
+        return self.data.__getitem__(idx)
 
     def __iter__(self):
         """Iterate over this container's items."""
@@ -227,4 +322,29 @@ class Container:
         if self.__iter_val >= self.capacity:
             raise StopIteration
         self.__iter_val += 1
-        return self.__data[-1 * self.__iter_val]
+        return from_code(self.__codes[-1 * self.__iter_val])
+
+
+# Containers shared between states, by capacity and Zobrist hash. Entries
+# are dropped once no state refers to the container any more.
+_POOL: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+
+
+def intern(container: Container) -> Container:
+    """Get the one shared container with the contents of `container`.
+
+    The first container seen with some contents is kept and returned for
+    every later container with the same contents, so properties such as
+    `is_solved` are only worked out once for them all. Interned containers
+    are frozen so that they can't be changed.
+    """
+    container.freeze()
+    key = (container.capacity, container.zobrist)
+    shared = _POOL.get(key)
+    if shared is None:
+        _POOL[key] = container
+        return container
+    if shared.codes != container.codes:
+        # Two contents share a hash, so only the first is shared
+        return container
+    return shared
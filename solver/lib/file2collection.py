@@ -1,7 +1,7 @@
 """Route files to the correct loader for convert to a collection."""
 import pathlib
 
-from solver.lib import json2collection, img2collection
+from solver.lib import json2collection
 from solver.lib.collection import ContainerCollection
 
 
@@ -11,5 +11,7 @@ def load(path: str, reject_invalid: bool) -> ContainerCollection:
     if file.suffix == ".json":
         with file.open() as fh:
             return json2collection.load(fh, reject_invalid=reject_invalid)
-    else:
-        return img2collection.load(path)
+    # Image recognition needs OpenCV and NumPy, so only import it for images
+    from solver.lib import img2collection  # pylint: disable=C0415
+
+    return img2collection.load(path)
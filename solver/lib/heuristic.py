@@ -0,0 +1,111 @@
+"""Admissible heuristics estimating the moves left to solve a collection.
+
+Each heuristic is a lower bound on the number of moves needed, so informed
+searches using them still find optimal solutions.
+They work on both `ContainerCollection` and `PackedCollection` states.
+"""
+from collections import Counter
+from typing import Callable, Hashable, List, Sequence, Tuple, Union
+
+from solver.lib.collection import ContainerCollection
+from solver.lib.packed import PackedCollection
+
+State = Union[ContainerCollection, PackedCollection]
+Heuristic = Callable[[State], int]
+
+
+def _contents(state: State) -> Tuple[List[Sequence[Hashable]], int]:
+    """Get the contents of each container and the smallest capacity."""
+    if isinstance(state, PackedCollection):
+        layout = state.layout
+        contents: List[Sequence[Hashable]] = [
+            segment.rstrip(b"\0") for segment in layout.segments(state.state)
+        ]
+        return contents, min(layout.capacities, default=0)
+    return (
+        [container.codes for container in state.data],
+        min((container.capacity for container in state.data), default=0),
+    )
+
+
+def _needed(count: int, capacity: int) -> int:
+    """Get the most containers `count` items of a colour can fill.
+
+    With containers of at least `capacity` this is an upper bound on the
+    containers holding the colour once solved, so colours spread further
+    than this still need moving even when the capacities differ.
+    """
+    return -(-count // capacity)
+
+
+def boundaries(state: State) -> int:
+    """Count the colour boundaries inside the containers.
+
+    This is also the number of runs of items sitting on top of a mismatched
+    colour. Each of those runs has to be moved at least once and a move
+    only ever lifts part of one run.
+    """
+    contents, _ = _contents(state)
+    return sum(
+        1
+        for content in contents
+        for lower, upper in zip(content, content[1:])
+        if lower != upper
+    )
+
+
+def splits(state: State) -> int:
+    """Count how many more containers each colour is split across than needed.
+
+    A move takes items from a single container so it can reduce the number
+    of containers holding a colour by at most one.
+    """
+    contents, capacity = _contents(state)
+    counts: Counter = Counter()
+    spread: Counter = Counter()
+    for content in contents:
+        counts.update(content)
+        spread.update(set(content))
+    return sum(
+        max(0, spread[colour] - _needed(count, capacity))
+        for colour, count in counts.items()
+    )
+
+
+def estimate(state: State) -> int:
+    """Combine the heuristics into the strongest admissible estimate.
+
+    On top of the `boundaries`, a colour resting at the bottom of more
+    containers than it needs must have the extra bottom runs moved too.
+    Those moves are distinct from the ones counted by `boundaries`, so the
+    two can be added. A move changes this sum by at most one so the
+    estimate is also consistent.
+    """
+    contents, capacity = _contents(state)
+    counts: Counter = Counter()
+    bottoms: Counter = Counter()
+    for content in contents:
+        counts.update(content)
+        if len(content) > 0:
+            bottoms[content[0]] += 1
+    extra_bottoms = sum(
+        max(0, bottoms[colour] - _needed(counts[colour], capacity))
+        for colour in bottoms
+    )
+    return max(boundaries(state) + extra_bottoms, splits(state))
+
+
+class Strongest:
+    """Combine admissible heuristics by taking the largest estimate.
+
+    The largest of several lower bounds is still a lower bound. Unlike a
+    lambda this can be pickled to be sent to other processes.
+    """
+
+    def __init__(self, *heuristics: Heuristic):
+        """Combine `heuristics`."""
+        self.heuristics = heuristics
+
+    def __call__(self, state: State) -> int:
+        """Get the largest estimate for `state`."""
+        return max(estimate(state) for estimate in self.heuristics)
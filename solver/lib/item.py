@@ -1,5 +1,10 @@
-"""Module representing a single coloured item."""
-from typing import Union
+"""Module representing a single coloured item.
+
+Containers store each item as a one byte colour code, starting at 1 so
+that 0 can mark an empty slot, and only create `Item` objects when asked
+for them.
+"""
+from typing import Dict, Tuple, Union
 
 from solver.lib.colour import Colour
 
@@ -12,7 +17,7 @@ class Item:
         if isinstance(colour, Colour):
             self.colour = colour
         if isinstance(colour, str):
-            if colour in dir(Colour):
+            if colour in Colour.__members__:
                 self.colour = Colour[colour]
             else:
                 self.colour = Colour(colour)
@@ -24,7 +29,7 @@ class Item:
         if isinstance(other, Colour):
             return self.colour == other
         if isinstance(other, str):
-            if other in dir(Colour):
+            if other in Colour.__members__:
                 return self.colour == Colour[other]
             return self.colour == Colour(other)
         return False
@@ -44,3 +49,24 @@ class Item:
     def __hash__(self):
         """Get the hash of the colour of this item."""
         return self.colour.__hash__()
+
+
+# The code of each colour and the shared item for each code
+CODES: Dict[Colour, int] = {
+    colour: code for code, colour in enumerate(Colour, start=1)
+}
+ITEMS: Tuple[Item, ...] = tuple(Item(colour) for colour in Colour)
+
+
+def to_code(value: Union[Item, Colour, str]) -> int:
+    """Get the colour code of `value`."""
+    if isinstance(value, Item):
+        return CODES[value.colour]
+    if isinstance(value, Colour):
+        return CODES[value]
+    return CODES[Item(value).colour]
+
+
+def from_code(code: int) -> Item:
+    """Get the item for the colour code `code`."""
+    return ITEMS[code - 1]
@@ -0,0 +1,271 @@
+"""A compact byte encoding of a collection for use in the search core.
+
+Every container is given `capacity` bytes in a single `bytes` value, with
+one byte per slot holding a colour ID (starting at 1) from the bottom of
+the container up and zero marking an empty slot.
+Moves, pours, the solved check and hashing all work on the bytes directly
+so no `Container` or `Item` objects are created whilst searching.
+"""
+from __future__ import annotations
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+from solver.lib.collection import ContainerCollection
+from solver.lib.container import Container
+from solver.lib.item import Item
+from solver.lib.move import Move
+from solver.lib.symmetry import canonical_form
+
+# Per container summary of (length, head colour ID, run length at the head)
+Summary = Tuple[Tuple[int, int, int], ...]
+
+
+class Layout:
+    """Describes how the containers of a collection are packed into bytes."""
+
+    def __init__(self, capacities: Sequence[int], colours: Sequence[Item]):
+        """Create a layout for `capacities` and the colour table `colours`.
+
+        The colour ID of each item is its index in `colours` plus one.
+        """
+        if len(colours) > 255:
+            raise ValueError("Too many colours to pack", len(colours))
+        self.capacities = tuple(capacities)
+        self.colours = tuple(colours)
+        self.ids: Dict[Item, int] = {
+            colour: idx + 1 for idx, colour in enumerate(self.colours)
+        }
+        offsets = []
+        offset = 0
+        for capacity in self.capacities:
+            offsets.append(offset)
+            offset += capacity
+        self.offsets = tuple(offsets)
+        self.size = offset
+        self.uniform = len(set(self.capacities)) <= 1
+
+    @classmethod
+    def for_collection(cls, collection: ContainerCollection) -> Layout:
+        """Build the layout needed to encode `collection`."""
+        colours: List[Item] = []
+        for container in collection.data:
+            for item in container.data:
+                if item not in colours:
+                    colours.append(
+                        item if isinstance(item, Item) else Item(item)
+                    )
+        return cls(
+            [container.capacity for container in collection.data], colours
+        )
+
+    def encode(self, collection: ContainerCollection) -> bytes:
+        """Encode `collection` into a packed state."""
+        if len(collection) != len(self.capacities):
+            raise ValueError("Collection does not match layout")
+        state = bytearray(self.size)
+        for offset, container in zip(self.offsets, collection.data):
+            for idx, item in enumerate(container.data):
+                state[offset + idx] = self.ids[item]
+        return bytes(state)
+
+    def decode(self, state: bytes) -> ContainerCollection:
+        """Decode a packed state back into a `ContainerCollection`."""
+        containers = []
+        for segment, capacity in zip(self.segments(state), self.capacities):
+            items = [self.colours[code - 1] for code in segment if code]
+            containers.append(Container(items, capacity))
+        return ContainerCollection(containers)
+
+    def segments(self, state: bytes) -> List[bytes]:
+        """Split a packed state into the bytes for each container."""
+        return [
+            state[offset : offset + capacity]
+            for offset, capacity in zip(self.offsets, self.capacities)
+        ]
+
+
+class PackedCollection:
+    """A collection encoded as bytes for fast searching.
+
+    This provides the same searching interface as `ContainerCollection`
+    (`is_solved`, `get_moves`, `is_valid`, `after` and `key`) and can be
+    converted back with `to_collection` once the search is complete.
+    """
+
+    __slots__ = (
+        "layout",
+        "state",
+        "__summary",
+        "__moves",
+        "__key",
+        "__symmetric_key",
+    )
+
+    def __init__(self, layout: Layout, state: bytes):
+        """Wrap the packed `state` that was encoded with `layout`."""
+        self.layout = layout
+        self.state = state
+        self.__summary: Optional[Summary] = None
+        self.__moves: Optional[List[Move]] = None
+        self.__key: Optional[Hashable] = None
+        self.__symmetric_key: Optional[Hashable] = None
+
+    @classmethod
+    def from_collection(
+        cls, collection: ContainerCollection
+    ) -> PackedCollection:
+        """Pack `collection` using a new layout."""
+        layout = Layout.for_collection(collection)
+        return cls(layout, layout.encode(collection))
+
+    def to_collection(self) -> ContainerCollection:
+        """Unpack this state into a `ContainerCollection`."""
+        return self.layout.decode(self.state)
+
+    def _summary(self) -> Summary:
+        """Get the length, head and head run length of each container."""
+        if self.__summary is None:
+            summary = []
+            for segment in self.layout.segments(self.state):
+                length = segment.find(0)
+                if length == -1:
+                    length = len(segment)
+                if length == 0:
+                    summary.append((0, 0, 0))
+                    continue
+                head = segment[length - 1]
+                rest = segment[:length].rstrip(segment[length - 1 : length])
+                summary.append((length, head, length - len(rest)))
+            self.__summary = tuple(summary)
+        return self.__summary
+
+    @property
+    def is_solved(self) -> bool:
+        """Check if every container is empty or full of a single colour."""
+        return all(
+            length == 0 or (length == run == capacity)
+            for (length, _, run), capacity in zip(
+                self._summary(), self.layout.capacities
+            )
+        )
+
+    def get_moves(self) -> List[Move]:
+        """Get a list of possible moves.
+
+        The moves are generated in the same order, and pruned by the same
+        rules, as `ContainerCollection.get_moves`.
+        """
+        if self.__moves is not None:
+            return self.__moves
+        summary = self._summary()
+        capacities = self.layout.capacities
+        moves: List[Move] = []
+        for x, (length, head, run) in enumerate(summary):
+            # Skip empty, solved and single coloured containers
+            unique = run == length
+            if length == 0 or (
+                unique and (length > 2 or run == capacities[x])
+            ):
+                continue
+            used_in_empty = False
+            for y, (dest_length, dest_head, _) in enumerate(summary):
+                if x == y or run > capacities[y] - dest_length:
+                    continue
+                if dest_length == 0:
+                    # Only the first empty container is a useful destination
+                    if used_in_empty or unique:
+                        continue
+                    used_in_empty = True
+                elif dest_head != head:
+                    continue
+                moves.append(Move(x, y))
+        self.__moves = moves
+        return moves
+
+    def is_valid(self, move: Move) -> bool:
+        """Check if a move is valid for this collection."""
+        if move.src == move.dest:
+            return False
+        summary = self._summary()
+        length, head, run = summary[move.src]
+        dest_length, dest_head, _ = summary[move.dest]
+        if (
+            length == 0
+            or run > self.layout.capacities[move.dest] - dest_length
+        ):
+            return False
+        if dest_length == 0:
+            # Don't allow needless movement between containers
+            return run != length
+        return dest_head == head
+
+    def after(self, move: Move) -> PackedCollection:
+        """Get a new packed collection with `move` having been made."""
+        if not self.is_valid(move):
+            raise ValueError("Invalid move", move)
+        summary = self._summary()
+        length, head, run = summary[move.src]
+        dest_length = summary[move.dest][0]
+        src_offset = self.layout.offsets[move.src] + length
+        dest_offset = self.layout.offsets[move.dest] + dest_length
+        state = bytearray(self.state)
+        state[src_offset - run : src_offset] = bytes(run)
+        state[dest_offset : dest_offset + run] = bytes((head,)) * run
+        return PackedCollection(self.layout, bytes(state))
+
+    @property
+    def key(self) -> Hashable:
+        """Get the canonical, hashable key for this state.
+
+        As with `ContainerCollection.key` this ignores the order of the
+        containers.
+        """
+        if self.__key is None:
+            segments = sorted(self.layout.segments(self.state))
+            if self.layout.uniform:
+                # Fixed width segments can be joined without ambiguity
+                self.__key = b"".join(segments)
+            else:
+                self.__key = tuple(segments)
+        return self.__key
+
+    @property
+    def symmetric_key(self) -> Hashable:
+        """Get a key that also ignores which colour is which.
+
+        See `ContainerCollection.symmetric_key`.
+        """
+        if self.__symmetric_key is None:
+            capacities = self.layout.capacities
+            _, form = canonical_form(
+                [
+                    (capacity, segment.rstrip(b"\0"))
+                    for capacity, segment in zip(
+                        capacities, self.layout.segments(self.state)
+                    )
+                ]
+            )
+            if self.layout.uniform:
+                # Renamed colours start from zero so shift them past empty
+                self.__symmetric_key = b"".join(
+                    bytes(colour + 1 for colour in content).ljust(
+                        capacity, b"\0"
+                    )
+                    for capacity, content in form
+                )
+            else:
+                self.__symmetric_key = form
+        return self.__symmetric_key
+
+    def __len__(self) -> int:
+        """Get the number of containers in the collection."""
+        return len(self.layout.capacities)
+
+    def __eq__(self, other: object) -> bool:
+        """Check if this state is the same as `other`, ignoring order."""
+        if isinstance(other, PackedCollection):
+            return self.key == other.key
+        return False
+
+    def __hash__(self) -> int:
+        """Get the hash of this state's canonical key."""
+        return hash(self.key)
@@ -0,0 +1,410 @@
+"""Searches that spread their work across processes.
+
+`bfs` splits each depth of the search into chunks of packed states that are
+expanded by a pool of worker processes. The children are merged back in
+the order a serial search would have made them and deduplicated against a
+single transposition table, so the solution found is identical to
+`solver.lib.search.bfs`.
+
+`astar` is a hash distributed A* (HDA*) search: every worker owns the
+states whose key hashes to it, keeping its own open and closed sets, and
+sends the states it generates to their owners through queues.
+"""
+import heapq
+import itertools
+import logging
+import multiprocessing
+import os
+import queue as queues
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Hashable, List, Optional, Sequence, Set, Tuple
+
+from solver.lib import heuristic, pruning
+from solver.lib.collection import ContainerCollection
+from solver.lib.move import Move
+from solver.lib.packed import Layout, PackedCollection
+from solver.lib.search import Heuristic, Option, SearchStats, _Node
+
+# A child of an expanded state: move source and destination, the packed
+# state, its key and whether it is solved.
+Child = Tuple[int, int, bytes, Hashable, bool]
+
+# Frontiers smaller than this are expanded without using the pool
+MIN_PARALLEL = 64
+
+_layout: Optional[Layout] = None
+
+
+def _initialise(layout: Layout):
+    """Set the layout used by a worker process."""
+    global _layout  # pylint: disable=W0603
+    _layout = layout
+
+
+def _expand(states: Sequence[bytes]) -> List[List[Child]]:
+    """Get the children of each of the packed `states`."""
+    assert _layout is not None
+    expanded = []
+    for state in states:
+        col = PackedCollection(_layout, state)
+        children = []
+        for move in col.get_moves():
+            _next = col.after(move)
+            children.append(
+                (move.src, move.dest, _next.state, _next.key, _next.is_solved)
+            )
+        expanded.append(children)
+    return expanded
+
+
+def _chunks(states: List[bytes], count: int) -> List[List[bytes]]:
+    """Split `states` into `count` contiguous chunks."""
+    size = -(-len(states) // count)
+    return [states[idx : idx + size] for idx in range(0, len(states), size)]
+
+
+def bfs(
+    root: ContainerCollection,
+    stats: Optional[SearchStats] = None,
+    *,
+    workers: Optional[int] = None,
+) -> Optional[Option]:
+    """Perform a Breadth-first search across `workers` processes.
+
+    By default one worker is used per CPU.
+    """
+    if stats is None:
+        stats = SearchStats()
+    # Ensure the search is required
+    if root.is_solved:
+        return Option(root, tuple())
+    stats.unsolvable = pruning.unsolvable(root)
+    if stats.unsolvable is not None:
+        return None
+    workers = workers or os.cpu_count() or 1
+
+    start = PackedCollection.from_collection(root)
+    _initialise(start.layout)
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_initialise,
+            initargs=(start.layout,),
+        )
+    try:
+        return _search(start, stats, pool, workers)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def _search(
+    start: PackedCollection,
+    stats: SearchStats,
+    pool: Optional[ProcessPoolExecutor],
+    workers: int,
+) -> Optional[Option]:
+    """Search from `start` expanding large frontiers using `pool`."""
+    transposition: Set[Hashable] = {start.key}
+    queue: List[Tuple[bytes, _Node]] = [(start.state, _Node())]
+    while len(queue) > 0:
+        logging.debug(f"loop {queue[0][1].depth} Options {len(queue)}")
+        states = [state for state, _ in queue]
+        if pool is None or len(states) < MIN_PARALLEL:
+            expanded = _expand(states)
+        else:
+            # Use a few chunks per worker to even out the load
+            expanded = [
+                children
+                for chunk in pool.map(_expand, _chunks(states, workers * 4))
+                for children in chunk
+            ]
+        next_queue: List[Tuple[bytes, _Node]] = []
+        for (_, node), children in zip(queue, expanded):
+            stats.expanded += 1
+            for src, dest, state, key, is_solved in children:
+                stats.generated += 1
+                # Check if this state has already been reached
+                if key in transposition:
+                    stats.duplicates += 1
+                    continue
+                transposition.add(key)
+                # Leaf nodes are not filtered out here as finding them costs
+                # more than expanding them to find they have no children.
+                child = _Node(node, Move(src, dest))
+                if is_solved:
+                    return Option(start.layout.decode(state), child.moves())
+                next_queue.append((state, child))
+        queue = next_queue
+
+    # No valid options
+    return None
+
+
+# A state sent to its owner: moves made, packed state and the moves made
+# to reach it packed as pairs of source and destination bytes.
+Message = Tuple[int, bytes, bytes]
+
+# How many states a worker expands before sending on what it generated
+BATCH_SIZE = 32
+
+# Placeholder for the length of the best solution before one is found
+UNSOLVED = 2**31 - 1
+
+
+def _owner(key: Hashable, workers: int) -> int:
+    """Get the worker that owns the state with `key`.
+
+    The hash must be the same in every process so Python's randomised
+    `hash` can't be used.
+    """
+    data = key if isinstance(key, bytes) else b"".join(key)  # type: ignore
+    return zlib.crc32(data) % workers
+
+
+def astar(
+    root: ContainerCollection,
+    stats: Optional[SearchStats] = None,
+    *,
+    workers: Optional[int] = None,
+    estimate: Heuristic = heuristic.estimate,
+) -> Optional[Option]:
+    """Perform a hash distributed A* search across `workers` processes.
+
+    Each worker runs its own A* search over the states it owns and the
+    search ends once no worker holds a state that could lead to a solution
+    shorter than the best one found, so the solution is optimal.
+    By default one worker is used per CPU.
+    """
+    if stats is None:
+        stats = SearchStats()
+    # Ensure the search is required
+    if root.is_solved:
+        return Option(root, tuple())
+    stats.unsolvable = pruning.unsolvable(root)
+    if stats.unsolvable is not None:
+        return None
+    workers = workers or os.cpu_count() or 1
+
+    start = PackedCollection.from_collection(root)
+    context = multiprocessing.get_context()
+    inboxes = [context.Queue() for _ in range(workers)]
+    results = context.Queue()
+    # Shared counters of batches sent and received and the idle workers are
+    # used to detect when the search is over.
+    sent = context.Array("q", workers)
+    received = context.Array("q", workers)
+    idle = context.Array("b", workers)
+    incumbent = context.Value("q", UNSOLVED)
+    stop = context.Event()
+
+    owner = _owner(start.key, workers)
+    sent[owner] += 1
+    inboxes[owner].put([(0, start.state, b"")])
+    processes = [
+        context.Process(
+            target=_worker,
+            args=(
+                idx,
+                start.layout,
+                estimate,
+                inboxes,
+                results,
+                (sent, received, idle),
+                incumbent,
+                stop,
+            ),
+            daemon=True,
+        )
+        for idx in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    error: Optional[BaseException] = None
+    try:
+        _wait_until_idle(sent, received, idle, processes)
+        stop.set()
+        solution: Optional[Tuple[bytes, bytes]] = None
+        finished = 0
+        while finished < workers:
+            try:
+                message = results.get(timeout=0.1)
+            except queues.Empty:
+                if any(process.is_alive() for process in processes):
+                    continue
+                # Every worker has exited so nothing more can arrive
+                error = error or RuntimeError("A search worker exited early")
+                break
+            if message[0] == "error":
+                finished += 1
+                error = error or message[1]
+            elif message[0] == "stats":
+                finished += 1
+                stats.expanded += message[1]
+                stats.generated += message[2]
+                stats.duplicates += message[3]
+            elif solution is None or len(message[1]) < len(solution[0]):
+                solution = (message[1], message[2])
+        for process in processes:
+            process.join()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    if error is not None:
+        raise error
+    if solution is None:
+        # No valid options
+        return None
+    path, state = solution
+    return Option(
+        start.layout.decode(state),
+        tuple(
+            Move(path[idx], path[idx + 1]) for idx in range(0, len(path), 2)
+        ),
+    )
+
+
+def _wait_until_idle(sent, received, idle, processes):
+    """Wait until every worker is idle with no states left to deliver.
+
+    The counters are read twice and must not have changed in between so
+    that a batch being delivered whilst they were read is not missed.
+    Workers only exit once told to stop, so this also returns as soon as
+    any of `processes` has exited after a failure.
+    """
+    last = None
+    while True:
+        if not all(process.is_alive() for process in processes):
+            return
+        snapshot = (tuple(received), tuple(sent), all(idle))
+        if snapshot[2] and sum(snapshot[0]) == sum(snapshot[1]):
+            if snapshot == last:
+                return
+        last = snapshot
+        time.sleep(0.005)
+
+
+def _worker(
+    idx: int,
+    layout: Layout,
+    estimate: Heuristic,
+    inboxes,
+    results,
+    counters,
+    incumbent,
+    stop,
+):
+    """Run the search of worker `idx`, reporting any error it raises.
+
+    The error is sent to `results` so the parent can stop the search and
+    raise it, rather than waiting for a worker that has gone.
+    """
+    try:
+        _search_owned(
+            idx, layout, estimate, inboxes, results, counters, incumbent, stop
+        )
+    except Exception as err:  # pylint: disable=W0703
+        results.put(("error", err))
+
+
+def _search_owned(
+    idx: int,
+    layout: Layout,
+    estimate: Heuristic,
+    inboxes,
+    results,
+    counters,
+    incumbent,
+    stop,
+):
+    """Run the A* search for the states owned by worker `idx`."""
+    sent, received, idle = counters
+    inbox = inboxes[idx]
+    order = itertools.count()
+    # The open list and the fewest moves found to reach each owned state
+    open_list: List[Tuple[int, int, int, int, bytes, bytes]] = []
+    best: Dict[Hashable, int] = {}
+    outgoing: List[List[Message]] = [[] for _ in inboxes]
+    expanded = generated = duplicates = 0
+
+    def receive(batch: List[Message]):
+        """Add the states in `batch` to the open list."""
+        nonlocal duplicates
+        for depth, state, path in batch:
+            col = PackedCollection(layout, state)
+            if best.get(col.key, depth + 1) <= depth:
+                duplicates += 1
+                continue
+            best[col.key] = depth
+            cost = estimate(col)
+            if depth + cost < incumbent.value:
+                heapq.heappush(
+                    open_list,
+                    (depth + cost, cost, next(order), depth, state, path),
+                )
+
+    while not stop.is_set():
+        if len(open_list) == 0 or open_list[0][0] >= incumbent.value:
+            # Nothing owned can lead to a better solution so wait for more
+            open_list.clear()
+            idle[idx] = 1
+            try:
+                batch = inbox.get(timeout=0.005)
+            except queues.Empty:
+                continue
+            idle[idx] = 0
+            received[idx] += 1
+            receive(batch)
+            continue
+
+        for _ in range(BATCH_SIZE):
+            if len(open_list) == 0 or open_list[0][0] >= incumbent.value:
+                break
+            _, _, _, depth, state, path = heapq.heappop(open_list)
+            col = PackedCollection(layout, state)
+            if best[col.key] < depth:
+                # A shorter route to this state has been found since
+                continue
+            expanded += 1
+            for move in col.get_moves():
+                _next = col.after(move)
+                generated += 1
+                next_path = path + bytes((move.src, move.dest))
+                if _next.is_solved:
+                    with incumbent.get_lock():
+                        if depth + 1 < incumbent.value:
+                            incumbent.value = depth + 1
+                            results.put(("solution", next_path, _next.state))
+                    continue
+                if depth + 2 >= incumbent.value:
+                    # An unsolved state needs at least one more move
+                    continue
+                message = (depth + 1, _next.state, next_path)
+                owner = _owner(_next.key, len(inboxes))
+                if owner == idx:
+                    receive([message])
+                else:
+                    outgoing[owner].append(message)
+
+        # Count each batch as sent before it can be received
+        for owner, batch in enumerate(outgoing):
+            if len(batch) > 0:
+                sent[idx] += 1
+                inboxes[owner].put(batch)
+                outgoing[owner] = []
+        # Take anything waiting without blocking
+        while True:
+            try:
+                batch = inbox.get_nowait()
+            except queues.Empty:
+                break
+            received[idx] += 1
+            receive(batch)
+
+    results.put(("stats", expanded, generated, duplicates))
@@ -0,0 +1,269 @@
+"""Pattern databases of exact distances for an abstraction of a puzzle.
+
+The abstraction keeps a few pattern colours and treats every other colour
+as the same "other" colour. Moves in the abstract puzzle are relaxed so
+that any real move is also an abstract move: a run of pattern colour is
+poured whole as normal, but any number of the "other" items at the top of
+a container can be poured, since they may be several runs of different
+real colours. The fewest abstract moves to an abstract goal is then never
+more than the real moves needed, so looking it up is an admissible
+heuristic.
+
+Every abstract state reachable from the puzzle is found and solved with a
+backward breadth-first search from the goals. The distances are written to
+a file of sorted fixed-width keys followed by one distance byte per key,
+which is memory mapped when used so that every process using the same
+file shares one copy in the page cache.
+"""
+import json
+import mmap
+import struct
+from collections import deque
+from typing import (
+    BinaryIO,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from solver.lib.collection import ContainerCollection
+from solver.lib.packed import Layout, PackedCollection
+
+State = Union[ContainerCollection, PackedCollection]
+
+MAGIC = b"CPDB\x00\x01"
+# Magic, number of containers, capacity, number of keys, length of names
+HEADER = struct.Struct("<6sHHIH")
+
+# The distance stored for states that can't reach a goal
+DEAD_END = 255
+
+
+def _key(segments: Sequence[bytes], capacity: int) -> bytes:
+    """Join abstract containers into a key that ignores their order."""
+    return b"".join(
+        sorted(segment.ljust(capacity, b"\0") for segment in segments)
+    )
+
+
+def _children(key: bytes, capacity: int, other: int) -> Iterator[bytes]:
+    """Get every state one relaxed abstract move away from `key`."""
+    segments = [
+        key[offset : offset + capacity].rstrip(b"\0")
+        for offset in range(0, len(key), capacity)
+    ]
+    runs = []
+    for segment in segments:
+        run = 0
+        while run < len(segment) and segment[-1 - run] == segment[-1]:
+            run += 1
+        runs.append(run)
+    for src, segment in enumerate(segments):
+        if len(segment) == 0:
+            continue
+        head = segment[-1]
+        for dest, target in enumerate(segments):
+            if dest == src or (len(target) > 0 and target[-1] != head):
+                continue
+            space = capacity - len(target)
+            if head == other:
+                amounts = range(1, min(runs[src], space) + 1)
+            elif runs[src] <= space:
+                amounts = range(runs[src], runs[src] + 1)
+            else:
+                continue
+            for amount in amounts:
+                poured = list(segments)
+                poured[src] = segment[:-amount]
+                poured[dest] = target + bytes((head,)) * amount
+                yield _key(poured, capacity)
+
+
+def _is_goal(key: bytes, capacity: int) -> bool:
+    """Check if every abstract container is empty or full of one colour."""
+    for offset in range(0, len(key), capacity):
+        segment = key[offset : offset + capacity]
+        if segment[0] != 0 and segment.count(segment[0]) != capacity:
+            return False
+    return True
+
+
+def build(
+    root: ContainerCollection,
+    colours: Sequence[str],
+    max_states: int = 2000000,
+) -> Tuple[List[bytes], bytearray]:
+    """Find the distance to a goal of every abstract state of `root`.
+
+    `colours` names the pattern colours. Returns the sorted keys and the
+    distance of each, or `DEAD_END` where no goal can be reached.
+    Raises `ValueError` if the abstraction has more than `max_states`.
+    """
+    layout = Layout.for_collection(root)
+    if not layout.uniform:
+        raise ValueError("Containers must share a capacity")
+    capacity = layout.capacities[0]
+    table = _table(layout, colours)
+    start = _key(
+        [
+            segment.translate(table)
+            for segment in layout.segments(layout.encode(root))
+        ],
+        capacity,
+    )
+
+    # Find every reachable state and the states each is reached from
+    other = len(colours) + 1
+    index: Dict[bytes, int] = {start: 0}
+    keys = [start]
+    parents: List[List[int]] = [[]]
+    for parent, key in enumerate(keys):
+        for child in _children(key, capacity, other):
+            idx = index.get(child)
+            if idx is None:
+                if len(keys) >= max_states:
+                    raise ValueError("Too many abstract states", max_states)
+                idx = len(keys)
+                index[child] = idx
+                keys.append(child)
+                parents.append([])
+            parents[idx].append(parent)
+    del index
+
+    # Search backwards from every goal at once
+    distances = bytearray([DEAD_END]) * len(keys)
+    queue: Deque[int] = deque()
+    for idx, key in enumerate(keys):
+        if _is_goal(key, capacity):
+            distances[idx] = 0
+            queue.append(idx)
+    while queue:
+        idx = queue.popleft()
+        # Distances too large for a byte are capped to stay underestimates
+        distance = min(distances[idx] + 1, DEAD_END - 1)
+        for parent in parents[idx]:
+            if distances[parent] == DEAD_END:
+                distances[parent] = distance
+                queue.append(parent)
+
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    return [keys[idx] for idx in order], bytearray(
+        distances[idx] for idx in order
+    )
+
+
+def write(
+    file: BinaryIO,
+    root: ContainerCollection,
+    colours: Sequence[str],
+    keys: Sequence[bytes],
+    distances: bytes,
+):
+    """Write a pattern database built for `root` to `file`."""
+    names = json.dumps(list(colours)).encode()
+    file.write(
+        HEADER.pack(
+            MAGIC,
+            len(root),
+            root.data[0].capacity,
+            len(keys),
+            len(names),
+        )
+    )
+    file.write(names)
+    for key in keys:
+        file.write(key)
+    file.write(distances)
+
+
+def _table(layout: Layout, colours: Sequence[str]) -> bytes:
+    """Get the translation of `layout` colour IDs into abstract colours."""
+    table = bytearray([len(colours) + 1]) * 256
+    table[0] = 0
+    for idx, colour in enumerate(layout.colours):
+        name = colour.colour.name
+        table[idx + 1] = (
+            colours.index(name) + 1 if name in colours else len(colours) + 1
+        )
+    return bytes(table)
+
+
+class PatternDatabase:
+    """A pattern database memory mapped from the file at `path`.
+
+    The database is called with a state to look up its estimate. States
+    that were not found when it was built are estimated as 0.
+    """
+
+    def __init__(self, path: str):
+        """Map the database stored at `path`."""
+        self.path = path
+        with open(path, "rb") as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, containers, capacity, count, names = HEADER.unpack_from(
+            self.data
+        )
+        if magic != MAGIC:
+            raise ValueError("Not a pattern database", path)
+        self.containers = containers
+        self.capacity = capacity
+        self.count = count
+        self.colours: Tuple[str, ...] = tuple(
+            json.loads(self.data[HEADER.size : HEADER.size + names])
+        )
+        self.width = containers * capacity
+        self.keys = HEADER.size + names
+        self.distances = self.keys + count * self.width
+        self.__tables: Dict[Layout, bytes] = {}
+
+    def __getstate__(self):
+        """Only pickle the path so other processes map the same file."""
+        return self.path
+
+    def __setstate__(self, path: str):
+        """Map the database in this process."""
+        self.__init__(path)  # type: ignore
+
+    def _abstract(self, state: State) -> bytes:
+        """Get the abstract key of `state`."""
+        if isinstance(state, PackedCollection):
+            layout = state.layout
+            segments = layout.segments(state.state)
+        else:
+            layout = Layout.for_collection(state)
+            segments = layout.segments(layout.encode(state))
+        table = self.__tables.get(layout)
+        if table is None:
+            table = _table(layout, self.colours)
+            if isinstance(state, PackedCollection):
+                self.__tables[layout] = table
+        key = _key(
+            [segment.translate(table) for segment in segments], self.capacity
+        )
+        if len(key) != self.width:
+            raise ValueError("State does not match the pattern database")
+        return key
+
+    def __call__(self, state: State) -> int:
+        """Get the distance of the abstraction of `state` from a goal."""
+        key = self._abstract(state)
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            offset = self.keys + mid * self.width
+            if self.data[offset : offset + self.width] < key:
+                low = mid + 1
+            else:
+                high = mid
+        offset = self.keys + low * self.width
+        if low < self.count and self.data[offset : offset + self.width] == key:
+            return self.data[self.distances + low]
+        return 0
+
+    def close(self):
+        """Unmap the database."""
+        self.data.close()
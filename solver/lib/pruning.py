@@ -0,0 +1,99 @@
+"""Checks that find puzzles and states that can never be solved.
+
+`unsolvable` is run once before a search to rule out puzzles that could
+never be sorted whatever moves are made. `dead_end` is run on the states
+found during a search so that nothing below a state that can't lead to a
+solution is searched. `redundant` finds moves that would only search a
+different order of the same pours. They all work on `ContainerCollection`
+and `PackedCollection` states.
+"""
+from collections import Counter
+from typing import Callable, List, Optional, Tuple, Union
+
+from solver.lib.collection import ContainerCollection
+from solver.lib.item import from_code
+from solver.lib.move import Move
+from solver.lib.packed import PackedCollection
+
+State = Union[ContainerCollection, PackedCollection]
+Detector = Callable[[State], bool]
+
+
+def _no_moves(state: State) -> bool:
+    """Check if an unsolved `state` has no moves left to make.
+
+    Every container is either full or has a different colour on top to
+    everything that could be poured into it.
+    """
+    return not state.is_solved and len(state.get_moves()) == 0
+
+
+# Cheap checks that each prove a state can't lead to a solution. The moves
+# found are cached on the state so `_no_moves` costs nothing extra for any
+# state the search goes on to expand.
+DETECTORS: List[Detector] = [_no_moves]
+
+
+def dead_end(state: State) -> bool:
+    """Check if no solution can be reached from `state`."""
+    return any(detector(state) for detector in DETECTORS)
+
+
+def unsolvable(root: ContainerCollection) -> Optional[str]:
+    """Get the reason `root` can never be solved, or None if it might be.
+
+    Moves never change how many items there are of each colour, so each
+    colour must exactly fill some of the containers and the colours
+    together must fit into separate containers.
+    """
+    counts = Counter(
+        code for container in root.data for code in container.codes
+    )
+    capacities = [container.capacity for container in root.data]
+    # A bit set for every total that some set of the containers holds
+    totals = 1
+    for capacity in capacities:
+        totals |= totals << capacity
+    for code, count in counts.items():
+        if not (totals >> count) & 1:
+            name = from_code(code).colour.name
+            return f"{count} {name} can't fill whole containers"
+    needed = sum(
+        -(-count // max(capacities, default=1)) for count in counts.values()
+    )
+    if needed > len(capacities):
+        return (
+            f"{needed} containers are needed but there are {len(capacities)}"
+        )
+    if dead_end(root):
+        return "no moves can be made"
+    return None
+
+
+def _length_and_run(state: State, idx: int) -> Tuple[int, int]:
+    """Get the length and head run length of container `idx`."""
+    if isinstance(state, PackedCollection):
+        length, _, run = state._summary()[idx]  # pylint: disable=W0212
+        return length, run
+    container = state.data[idx]
+    return len(container), container.num_matching_head
+
+
+def redundant(state: State, last: Optional[Move], move: Move) -> bool:
+    """Check if making `move` after `last` only re-orders the same pours.
+
+    `state` is the state reached by making `last`. Pours between four
+    different containers give the same state made in either order, so
+    only the order with the smaller move first needs to be searched.
+    The moves into an empty container depend on which other containers
+    are empty, so pours into empty containers are never skipped.
+    """
+    if last is None or (move.src, move.dest) >= (last.src, last.dest):
+        return False
+    if {move.src, move.dest} & {last.src, last.dest}:
+        return False
+    length, run = _length_and_run(state, last.dest)
+    if length == run:
+        # The last pour may have been into an empty container
+        return False
+    return _length_and_run(state, move.dest)[0] > 0
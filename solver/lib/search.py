@@ -1,10 +1,45 @@
-"""Implementation of search algorithms."""
+"""Implementation of search algorithms.
+
+Every search takes the puzzle to solve, a `SearchStats` to fill in and
+these keyword options:
+
+- `packed` runs the search on the `PackedCollection` encoding rather than
+  the object model.
+- `symmetry` only searches one of the states that differ by a renaming of
+  their colours, see `_key_function`.
+- `reduction` only searches one order of independent pours, see
+  `pruning.redundant`.
+"""
+from __future__ import annotations
+import heapq
+import itertools
 import logging
-from typing import List, Optional, Tuple
+import operator
+import time
+from collections import OrderedDict
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 from dataclasses import dataclass
 
-from solver.lib.collection import ContainerCollection
+from solver.lib import heuristic, pruning
+from solver.lib.collection import ContainerCollection, PourCache
 from solver.lib.move import Move
+from solver.lib.packed import PackedCollection
+
+# Searches can run on either the object model or the packed encoding
+State = Union[ContainerCollection, PackedCollection]
+Heuristic = heuristic.Heuristic
+KeyFunction = Callable[[State], Hashable]
 
 
 @dataclass
@@ -15,78 +50,513 @@ class Option:
     moves: Tuple[Move, ...]
 
 
-def bfs(root: ContainerCollection) -> Optional[Option]:
-    """Perform a Breadth-first search to find an optimal solution."""
+class _Node:
+    """A compact node in the search tree.
+
+    Each node only records the move made from its parent, the full sequence
+    of moves is rebuilt by walking the parents once a solution is found.
+    """
+
+    __slots__ = ("parent", "move", "depth")
+
+    def __init__(
+        self, parent: Optional[_Node] = None, move: Optional[Move] = None
+    ):
+        """Create a node reached from `parent` by making `move`."""
+        self.parent = parent
+        self.move = move
+        self.depth: int = 0 if parent is None else parent.depth + 1
+
+    def moves(self) -> Tuple[Move, ...]:
+        """Get the moves that lead from the root to this node."""
+        moves: List[Move] = []
+        node: Optional[_Node] = self
+        while node is not None and node.move is not None:
+            moves.append(node.move)
+            node = node.parent
+        return tuple(reversed(moves))
+
+
+@dataclass
+class SearchStats:
+    """Counters describing the work done by a search.
+
+    Pass an instance to a search function to have it filled in. When the
+    puzzle is ruled out without searching `unsolvable` gives the reason.
+    """
+
+    expanded: int = 0
+    generated: int = 0
+    duplicates: int = 0
+    pour_hits: int = 0
+    pour_misses: int = 0
+    unsolvable: Optional[str] = None
+
+    @property
+    def pour_hit_rate(self) -> float:
+        """Get the fraction of pours found in the search's pour cache."""
+        total = self.pour_hits + self.pour_misses
+        return self.pour_hits / total if total else 0.0
+
+
+def _start(
+    root: ContainerCollection, packed: bool, stats: SearchStats
+) -> State:
+    """Get the state to start searching from.
+
+    The object model gets a pour cache of its own for the search, which
+    counts its hits in `stats` and goes once the search's states do.
+    """
+    if packed:
+        return PackedCollection.from_collection(root)
+    return root.with_pours(PourCache(stats=stats))
+
+
+def _key_function(symmetry: bool) -> KeyFunction:
+    """Get the function giving the key states are deduplicated by.
+
+    With `symmetry` states that only differ by which colour is which share
+    a key, so only one of them is searched.
+    """
+    return operator.attrgetter("symmetric_key" if symmetry else "key")
+
+
+def _unsolvable(root: ContainerCollection, stats: SearchStats) -> bool:
+    """Check if `root` can be ruled out without searching.
+
+    The reason it is ruled out is recorded in `stats`.
+    """
+    reason = stats.unsolvable = pruning.unsolvable(root)
+    if reason is not None:
+        logging.debug(f"unsolvable: {reason}")
+    return reason is not None
+
+
+def _moves(state: State, node: _Node, reduction: bool) -> List[Move]:
+    """Get the moves to search from `state`, which was reached by `node`."""
+    moves = state.get_moves()
+    if not reduction or node.move is None:
+        return moves
+    return [
+        move for move in moves if not pruning.redundant(state, node.move, move)
+    ]
+
+
+def _result(state: State, node: _Node) -> Option:
+    """Build the result of a search that finished at `state`."""
+    if isinstance(state, PackedCollection):
+        state = state.to_collection()
+    return Option(state, node.moves())
+
+
+def bfs(
+    root: ContainerCollection,
+    stats: Optional[SearchStats] = None,
+    *,
+    packed: bool = False,
+    symmetry: bool = False,
+    reduction: bool = False,
+) -> Optional[Option]:
+    """Perform a Breadth-first search to find an optimal solution.
+
+    A single transposition table is kept for the whole search so every
+    state is expanded at most once, no matter the depth it is reached at.
+    """
+    if stats is None:
+        stats = SearchStats()
     # Ensure the search is required
     if root.is_solved:
         return Option(root, tuple())
-    queue: List[Option] = [
-        Option(root.after(move), (move,)) for move in root.get_moves()
-    ]
+    if _unsolvable(root, stats):
+        return None
+    start = _start(root, packed, stats)
+    key = _key_function(symmetry)
+    transposition: Set[Hashable] = {key(start)}
+    queue: List[Tuple[State, _Node]] = [(start, _Node())]
     while len(queue) > 0:
-        logging.debug(f"loop {len(queue[0].moves)} Options {len(queue)}")
-        next_queue: List[Option] = []
-        discovered: List[ContainerCollection] = []
-        for option in queue:
-            for move in option.collection.get_moves():
-                # If this move is the reverse of the previous move and the move
-                # before that was this move, a loop has been found and needs to
-                # be broken by simply ignoring this move.
-                if (
-                    len(option.moves) > 1
-                    and option.moves[-1] == move.reverse()
-                    and option.moves[-2] == move
-                ):
-                    continue
-                _next: ContainerCollection = option.collection.after(move)
-                is_solved = _next.is_solved
-                # If this is a leaf node, we cannot continue our search
-                if not is_solved and len(_next.get_moves()) == 0:
+        logging.debug(f"loop {queue[0][1].depth} Options {len(queue)}")
+        next_queue: List[Tuple[State, _Node]] = []
+        for collection, node in queue:
+            stats.expanded += 1
+            for move in _moves(collection, node, reduction):
+                _next: State = collection.after(move)
+                stats.generated += 1
+                # Check if this state has already been reached
+                next_key = key(_next)
+                if next_key in transposition:
+                    stats.duplicates += 1
                     continue
-                # Check if this option has been marked as visited
-                if _next in discovered:
+                transposition.add(next_key)
+                # Nothing below a dead end can be a solution
+                if pruning.dead_end(_next):
                     continue
-                moves = list(option.moves)
-                moves.append(move)
+                child = _Node(node, move)
                 # Check if a solution was found
-                if is_solved:
-                    return Option(_next, tuple(moves))
-                discovered.append(_next)
-                next_queue.append(Option(_next, tuple(moves)))
+                if _next.is_solved:
+                    return _result(_next, child)
+                next_queue.append((_next, child))
         queue = next_queue
 
+    logging.debug(f"pruned {stats.duplicates} duplicate states")
     # No valid options
     return None
 
 
-def dfs(root: ContainerCollection) -> Optional[Option]:
-    """Perform a depth-first search to find a solution."""
+def dfs(
+    root: ContainerCollection,
+    stats: Optional[SearchStats] = None,
+    *,
+    packed: bool = False,
+    symmetry: bool = False,
+    reduction: bool = False,
+) -> Optional[Option]:
+    """Perform a depth-first search to find a solution.
+
+    The search uses an explicit stack rather than recursion so the depth it
+    can reach is not limited by Python's recursion limit. Moves are tried
+    in the order given by `get_moves`.
+    """
+    if stats is None:
+        stats = SearchStats()
+    # Ensure the search is required
+    if root.is_solved:
+        return Option(root, tuple())
+    if _unsolvable(root, stats):
+        return None
+
+    start = _start(root, packed, stats)
+    key = _key_function(symmetry)
+    visited: Set[Hashable] = {key(start)}
+    # Each frame holds a state, its node and the moves left to try from it
+    stack: List[Tuple[State, _Node, Iterator[Move]]] = [
+        (start, _Node(), iter(start.get_moves()))
+    ]
+    stats.expanded += 1
+    while len(stack) > 0:
+        col, node, moves = stack[-1]
+        move = next(moves, None)
+        if move is None:
+            # After visiting all possible moves, nothing had a solution
+            stack.pop()
+            continue
+        _next = col.after(move)
+        stats.generated += 1
+        next_key = key(_next)
+        if next_key in visited:
+            stats.duplicates += 1
+            continue
+        visited.add(next_key)
+        child = _Node(node, move)
+        if _next.is_solved:
+            return _result(_next, child)
+        if pruning.dead_end(_next):
+            continue
+        stats.expanded += 1
+        stack.append((_next, child, iter(_moves(_next, child, reduction))))
+
+    return None
+
+
+def astar(
+    root: ContainerCollection,
+    stats: Optional[SearchStats] = None,
+    *,
+    packed: bool = False,
+    symmetry: bool = False,
+    reduction: bool = False,
+    estimate: Heuristic = heuristic.estimate,
+    weight: float = 1.0,
+) -> Optional[Option]:
+    """Perform an A* search to find an optimal solution.
+
+    States are expanded in order of the moves made plus the `estimate` of
+    the moves left, so with an admissible estimate this finds a solution
+    as short as `bfs` whilst expanding far fewer states.
+    A `weight` above one scales the estimate to find a solution faster that
+    is at most `weight` times longer than optimal.
+    """
+    if stats is None:
+        stats = SearchStats()
     # Ensure the search is required
     if root.is_solved:
         return Option(root, tuple())
+    if _unsolvable(root, stats):
+        return None
 
-    visited: List[ContainerCollection] = []
-    # Call the recursive function
-    return _dfs(visited, Option(root, tuple()))
+    return _astar(
+        _start(root, packed, stats),
+        stats,
+        estimate,
+        _key_function(symmetry),
+        weight,
+        reduction=reduction,
+    )
 
 
-def _dfs(
-    visited: List[ContainerCollection], option: Option
+def _astar(
+    start: State,
+    stats: SearchStats,
+    estimate: Heuristic,
+    key: KeyFunction,
+    weight: float = 1.0,
+    bound: Optional[int] = None,
+    deadline: Optional[float] = None,
+    reduction: bool = False,
 ) -> Optional[Option]:
-    col = option.collection
-    if col in visited:
+    """Run a weighted A* search from `start`.
+
+    When `bound` is given only solutions with fewer moves are searched for
+    and when the `time.monotonic` `deadline` passes the search gives up.
+    """
+    # Ties are broken by the smallest estimate and then first in, first out
+    order = itertools.count()
+    cost = estimate(start)
+    if bound is not None and cost >= bound:
+        return None
+    queue: List[Tuple[float, int, int, int, State, _Node]] = [
+        (weight * cost, cost, next(order), 0, start, _Node())
+    ]
+    # The fewest moves found so far to reach each state
+    best: Dict[Hashable, int] = {key(start): 0}
+    while len(queue) > 0:
+        _, _, _, depth, col, node = heapq.heappop(queue)
+        if best[key(col)] < depth:
+            # A shorter route to this state has been found since it was queued
+            continue
+        if col.is_solved:
+            return _result(col, node)
+        if deadline is not None and time.monotonic() > deadline:
+            return None
+        stats.expanded += 1
+        for move in _moves(col, node, reduction):
+            _next = col.after(move)
+            stats.generated += 1
+            next_key = key(_next)
+            if best.get(next_key, depth + 2) <= depth + 1:
+                stats.duplicates += 1
+                continue
+            best[next_key] = depth + 1
+            if pruning.dead_end(_next):
+                continue
+            cost = estimate(_next)
+            if bound is not None and depth + 1 + cost >= bound:
+                # This can't lead to a solution shorter than the bound
+                continue
+            heapq.heappush(
+                queue,
+                (
+                    depth + 1 + weight * cost,
+                    cost,
+                    next(order),
+                    depth + 1,
+                    _next,
+                    _Node(node, move),
+                ),
+            )
+
+    # No valid options
+    return None
+
+
+def anytime(
+    root: ContainerCollection,
+    stats: Optional[SearchStats] = None,
+    *,
+    packed: bool = False,
+    symmetry: bool = False,
+    reduction: bool = False,
+    estimate: Heuristic = heuristic.estimate,
+    weights: Sequence[float] = (5.0, 3.0, 2.0, 1.5, 1.0),
+    time_limit: Optional[float] = None,
+) -> Iterator[Option]:
+    """Search for progressively shorter solutions.
+
+    A weighted A* search is run for each of the `weights` in turn, each only
+    looking for a solution shorter than the best found so far. Every
+    improved solution is yielded as soon as it is found so the caller can
+    stop at any time and keep the last one. When the final weight is one
+    the last solution yielded is optimal.
+    The search stops once `time_limit` seconds have passed.
+    """
+    if stats is None:
+        stats = SearchStats()
+    # Ensure the search is required
+    if root.is_solved:
+        yield Option(root, tuple())
+        return
+    if _unsolvable(root, stats):
+        return
+
+    deadline = None
+    if time_limit is not None:
+        deadline = time.monotonic() + time_limit
+    start = _start(root, packed, stats)
+    key = _key_function(symmetry)
+    bound: Optional[int] = None
+    for weight in weights:
+        logging.debug(f"weight {weight} bound {bound}")
+        result = _astar(
+            start, stats, estimate, key, weight, bound, deadline, reduction
+        )
+        if result is not None:
+            bound = len(result.moves)
+            yield result
+        if deadline is not None and time.monotonic() > deadline:
+            return
+
+
+def idastar(
+    root: ContainerCollection,
+    stats: Optional[SearchStats] = None,
+    *,
+    packed: bool = False,
+    symmetry: bool = False,
+    reduction: bool = False,
+    estimate: Heuristic = heuristic.estimate,
+    cache_size: int = 100000,
+) -> Optional[Option]:
+    """Perform an iterative deepening A* search to find an optimal solution.
+
+    Repeated depth-first searches are made, each limited to the states whose
+    moves made plus `estimate` fit within a bound that grows until a
+    solution is found. Memory grows only with the depth of the search plus a
+    transposition cache of at most `cache_size` states that prunes states
+    already reached by a route at least as short.
+    """
+    if stats is None:
+        stats = SearchStats()
+    # Ensure the search is required
+    if root.is_solved:
+        return Option(root, tuple())
+    if _unsolvable(root, stats):
         return None
-    visited.append(col)
-    if col.is_solved:
-        return option
-
-    for move in col.get_moves():
-        next_moves = list(option.moves)
-        next_moves.append(move)
-        next_option = Option(col.after(move), tuple(next_moves))
-        result = _dfs(visited, next_option)
+
+    start = _start(root, packed, stats)
+    key = _key_function(symmetry)
+    bound: Optional[int] = estimate(start)
+    while bound is not None:
+        logging.debug(f"bound {bound}")
+        result, bound = _idastar(
+            start, bound, stats, estimate, key, cache_size, reduction
+        )
         if result is not None:
             return result
 
-    # After visiting all possible moves, nothing had a solution
+    # No valid options
+    return None
+
+
+def _idastar(
+    start: State,
+    bound: int,
+    stats: SearchStats,
+    estimate: Heuristic,
+    key: KeyFunction,
+    cache_size: int,
+    reduction: bool = False,
+) -> Tuple[Optional[Option], Optional[int]]:
+    """Search the states within `bound` for a solution.
+
+    Returns the solution if one was found, otherwise the smallest bound that
+    would allow more states to be searched or None if there are none.
+    """
+
+    def expand(col: State, node: _Node) -> Iterator[Tuple[int, State, Move]]:
+        """Get the children of `col`, most promising first."""
+        stats.expanded += 1
+        children = []
+        for move in _moves(col, node, reduction):
+            _next = col.after(move)
+            stats.generated += 1
+            children.append((estimate(_next), _next, move))
+        children.sort(key=lambda child: child[0])
+        return iter(children)
+
+    next_bound: Optional[int] = None
+    # The fewest moves found to reach each recently seen state
+    cache: OrderedDict[Hashable, int] = OrderedDict({key(start): 0})
+    stack = [(_Node(), expand(start, _Node()))]
+    while len(stack) > 0:
+        node, children = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            continue
+        cost, _next, move = child
+        depth = node.depth + 1
+        if depth + cost > bound:
+            if next_bound is None or depth + cost < next_bound:
+                next_bound = depth + cost
+            continue
+        next_key = key(_next)
+        if cache.get(next_key, depth + 1) <= depth:
+            stats.duplicates += 1
+            continue
+        cache[next_key] = depth
+        cache.move_to_end(next_key)
+        if len(cache) > cache_size:
+            cache.popitem(last=False)
+        if pruning.dead_end(_next):
+            continue
+        child_node = _Node(node, move)
+        if _next.is_solved:
+            return _result(_next, child_node), bound
+        stack.append((child_node, expand(_next, child_node)))
+
+    return None, next_bound
+
+
+def beam(
+    root: ContainerCollection,
+    stats: Optional[SearchStats] = None,
+    *,
+    packed: bool = False,
+    symmetry: bool = False,
+    reduction: bool = False,
+    estimate: Heuristic = heuristic.estimate,
+    width: int = 100,
+) -> Optional[Option]:
+    """Perform a beam search to quickly find a short solution.
+
+    This is a breadth-first search that only keeps the `width` states with
+    the lowest `estimate` at each depth, so the time and memory used per
+    depth stay flat. The solution is not guaranteed to be optimal and a
+    solution may be missed altogether.
+    """
+    if stats is None:
+        stats = SearchStats()
+    # Ensure the search is required
+    if root.is_solved:
+        return Option(root, tuple())
+    if _unsolvable(root, stats):
+        return None
+
+    start = _start(root, packed, stats)
+    key = _key_function(symmetry)
+    transposition: Set[Hashable] = {key(start)}
+    queue: List[Tuple[State, _Node]] = [(start, _Node())]
+    while len(queue) > 0:
+        logging.debug(f"loop {queue[0][1].depth} Options {len(queue)}")
+        candidates: List[Tuple[int, State, _Node]] = []
+        for collection, node in queue:
+            stats.expanded += 1
+            for move in _moves(collection, node, reduction):
+                _next = collection.after(move)
+                stats.generated += 1
+                next_key = key(_next)
+                if next_key in transposition:
+                    stats.duplicates += 1
+                    continue
+                transposition.add(next_key)
+                child = _Node(node, move)
+                if _next.is_solved:
+                    return _result(_next, child)
+                if pruning.dead_end(_next):
+                    continue
+                candidates.append((estimate(_next), _next, child))
+        # Keep the most promising states, earliest found first on a tie
+        candidates.sort(key=lambda candidate: candidate[0])
+        queue = [(col, node) for _, col, node in candidates[:width]]
+
+    # No valid options within the beam
     return None
@@ -0,0 +1,56 @@
+"""Canonical forms of puzzles that ignore container order and colour names.
+
+Two puzzles that only differ by the order of their containers or by a
+renaming of their colours have the same solutions, move for move once the
+containers are matched up.
+"""
+from typing import Dict, Hashable, List, Sequence, Tuple
+
+# Each container as its capacity and its contents, bottom first
+Contents = Sequence[Tuple[int, Sequence[Hashable]]]
+# The canonical puzzle with each colour renamed to an integer
+Form = Tuple[Tuple[int, Tuple[int, ...]], ...]
+
+
+def canonical_form(containers: Contents) -> Tuple[List[int], Form]:
+    """Get a canonical form of `containers` and the order it puts them in.
+
+    The containers are first ordered using only properties that don't
+    depend on colour names, the colours are then renamed in the order they
+    are first seen and the containers sorted on their renamed contents.
+    Puzzles that share a form are always the same puzzle up to symmetry and
+    in practice the same puzzle up to symmetry almost always has one form.
+    The order gives the index of the container placed at each position.
+    """
+    # Describe each colour by where it sits in the containers
+    places: Dict[Hashable, List[int]] = {}
+    for _, content in containers:
+        for height, item in enumerate(content):
+            places.setdefault(item, []).append(height)
+    invariant = {
+        item: tuple(sorted(heights)) for item, heights in places.items()
+    }
+
+    def shape(idx: int) -> Tuple:
+        capacity, content = containers[idx]
+        local: Dict[Hashable, int] = {}
+        return (
+            capacity,
+            len(content),
+            tuple(
+                (local.setdefault(item, len(local)), invariant[item])
+                for item in content
+            ),
+        )
+
+    order = sorted(range(len(containers)), key=shape)
+    names: Dict[Hashable, int] = {}
+    renamed = {}
+    for idx in order:
+        capacity, content = containers[idx]
+        renamed[idx] = (
+            capacity,
+            tuple(names.setdefault(item, len(names)) for item in content),
+        )
+    order.sort(key=renamed.__getitem__)
+    return order, tuple(renamed[idx] for idx in order)
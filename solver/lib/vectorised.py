@@ -0,0 +1,165 @@
+"""Level-synchronous breadth-first search over a NumPy frontier.
+
+The whole frontier is held as a 3-D array of packed states with one row per
+state, one column per container and one entry per slot, using the colour
+IDs of `solver.lib.packed.Layout`.
+Every legal pour for the frontier is found and applied with array
+operations and duplicate states are removed with a sort per level.
+"""
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from solver.lib import pruning
+from solver.lib.collection import ContainerCollection
+from solver.lib.move import Move
+from solver.lib.packed import Layout
+from solver.lib.search import Option, SearchStats
+
+
+def bfs(
+    root: ContainerCollection, stats: Optional[SearchStats] = None
+) -> Optional[Option]:
+    """Perform a vectorised Breadth-first search to find a solution.
+
+    This finds the same solution as `solver.lib.search.bfs` but requires
+    every container to share a capacity of at most 8.
+    """
+    if stats is None:
+        stats = SearchStats()
+    if root.is_solved:
+        return Option(root, tuple())
+    layout = Layout.for_collection(root)
+    if not layout.uniform or layout.capacities[0] > 8:
+        raise ValueError("Containers must share a capacity of at most 8")
+    stats.unsolvable = pruning.unsolvable(root)
+    if stats.unsolvable is not None:
+        return None
+    shape = (len(layout.capacities), layout.capacities[0])
+
+    frontier = np.frombuffer(layout.encode(root), dtype=np.uint8)
+    frontier = frontier.reshape((1,) + shape)
+    seen = _keys(frontier)
+    # The parent row and move that produced each row of every level
+    levels: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+    while len(frontier) > 0:
+        logging.debug(f"loop {len(levels)} Options {len(frontier)}")
+        parents, src, dest = _moves(frontier)
+        stats.expanded += len(np.unique(parents))
+        stats.generated += len(parents)
+        children = _pour(frontier, parents, src, dest)
+
+        solved = np.flatnonzero(_is_solved(children))
+        if len(solved) > 0:
+            idx = solved[0]
+            moves = [Move(int(src[idx]), int(dest[idx]))]
+            row = parents[idx]
+            for level_parents, level_src, level_dest in reversed(levels):
+                moves.append(Move(int(level_src[row]), int(level_dest[row])))
+                row = level_parents[row]
+            moves.reverse()
+            return Option(layout.decode(children[idx].tobytes()), tuple(moves))
+
+        # Keep the first occurrence of each state not seen at any depth
+        keys = _keys(children)
+        _, first = np.unique(keys, return_index=True)
+        first.sort()
+        pos = np.searchsorted(seen, keys[first])
+        found = seen[np.minimum(pos, len(seen) - 1)] == keys[first]
+        keep = first[~found]
+        stats.duplicates += len(children) - len(keep)
+        seen = np.sort(np.concatenate((seen, keys[keep])))
+
+        levels.append((parents[keep], src[keep], dest[keep]))
+        frontier = children[keep]
+
+    # No valid options
+    return None
+
+
+def _summary(states: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """Get the length, head colour and head run length of each container."""
+    capacity = states.shape[2]
+    length = np.count_nonzero(states, axis=2)
+    top = np.maximum(length - 1, 0)[..., None]
+    head = np.take_along_axis(states, top, axis=2)[..., 0]
+    run = np.zeros_like(length)
+    matching = length > 0
+    for depth in range(capacity):
+        pos = length - 1 - depth
+        slot = np.take_along_axis(states, np.maximum(pos, 0)[..., None], 2)
+        matching = matching & (pos >= 0) & (slot[..., 0] == head)
+        run += matching
+    return length, head, run
+
+
+def _is_solved(states: np.ndarray) -> np.ndarray:
+    """Check which states have every container empty or full of one colour."""
+    length, _, run = _summary(states)
+    full = (length == run) & (length == states.shape[2])
+    return np.all((length == 0) | full, axis=1)
+
+
+def _moves(states: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Find every legal move for every state.
+
+    The moves are pruned by the same rules and returned in the same order
+    as `ContainerCollection.get_moves` would give for each state in turn.
+    """
+    capacity = states.shape[2]
+    length, head, run = _summary(states)
+    unique = run == length
+    # Skip empty, solved and single coloured source containers
+    source = (length > 0) & ~(unique & ((length > 2) | (length == capacity)))
+    dest_empty = (length == 0)[:, None, :]
+    valid = (
+        source[:, :, None]
+        & ~np.eye(states.shape[1], dtype=bool)[None]
+        & (run[:, :, None] <= (capacity - length)[:, None, :])
+        & (
+            (dest_empty & ~unique[:, :, None])
+            | (~dest_empty & (head[:, None, :] == head[:, :, None]))
+        )
+    )
+    # Only the first empty container is a useful destination
+    into_empty = valid & dest_empty
+    valid &= ~into_empty | (np.cumsum(into_empty, axis=2) == 1)
+    parents, src, dest = np.nonzero(valid)
+    return parents, src, dest
+
+
+def _pour(
+    states: np.ndarray,
+    parents: np.ndarray,
+    src: np.ndarray,
+    dest: np.ndarray,
+) -> np.ndarray:
+    """Apply the move from `src` to `dest` to each of the `parents`."""
+    length, head, run = _summary(states)
+    children = states[parents]
+    amount = run[parents, src]
+    src_top = length[parents, src] - 1
+    dest_top = length[parents, dest]
+    colour = head[parents, src]
+    for depth in range(states.shape[2]):
+        (rows,) = np.nonzero(depth < amount)
+        children[rows, src[rows], src_top[rows] - depth] = 0
+        children[rows, dest[rows], dest_top[rows] + depth] = colour[rows]
+    return children
+
+
+def _keys(states: np.ndarray) -> np.ndarray:
+    """Get a canonical key for each state that ignores container order.
+
+    Each container is packed into a 64 bit integer, the containers of each
+    state are sorted and the result is viewed as a single opaque value so
+    the keys can be sorted and searched.
+    """
+    count, containers, capacity = states.shape
+    padded = np.zeros((count, containers, 8), dtype=np.uint8)
+    padded[:, :, :capacity] = states
+    packed = np.sort(padded.view(np.uint64)[..., 0], axis=1)
+    return np.ascontiguousarray(packed).view(
+        np.dtype((np.void, containers * 8))
+    )[:, 0]
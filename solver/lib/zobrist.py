@@ -0,0 +1,49 @@
+"""Zobrist hashes of container contents that can be updated per move.
+
+Every (height, colour) pair is given a fixed random 64-bit value and a
+container hashes to the XOR of the values of the items it holds, so adding
+or removing an item only XORs in one value. The hashes of the containers
+are summed, rather than XORed, into the hash of a collection: the sum still
+ignores the order of the containers but, unlike XOR, doesn't cancel out a
+pair of identical containers. A move then updates the collection hash by
+swapping the old hashes of the two containers for the new ones.
+"""
+import hashlib
+from typing import Dict, Hashable, Iterable, Tuple
+
+MASK = (1 << 64) - 1
+
+_PIECES: Dict[Tuple[int, Hashable], int] = {}
+
+
+def piece(height: int, colour: Hashable) -> int:
+    """Get the random value for `colour` at `height` in a container.
+
+    The values are derived from the colour's `repr` rather than drawn from
+    a random generator so they are the same in every process.
+    """
+    value = _PIECES.get((height, colour))
+    if value is None:
+        digest = hashlib.blake2b(
+            f"{height}:{colour!r}".encode(), digest_size=8
+        ).digest()
+        value = _PIECES[(height, colour)] = int.from_bytes(digest, "little")
+    return value
+
+
+def container(items: Iterable[Hashable]) -> int:
+    """Hash the `items` of a container, from the bottom up."""
+    value = 0
+    for height, item in enumerate(items):
+        value ^= piece(height, item)
+    return value
+
+
+def combine(hashes: Iterable[int]) -> int:
+    """Combine container hashes into one hash ignoring their order."""
+    return sum(hashes) & MASK
+
+
+def replace(value: int, old: Iterable[int], new: Iterable[int]) -> int:
+    """Update the combined `value` as containers change from `old` to `new`."""
+    return (value - sum(old) + sum(new)) & MASK
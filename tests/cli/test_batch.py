@@ -0,0 +1,131 @@
+"""Tests for the batch CLI."""
+import io
+import json
+import pathlib
+import tempfile
+from unittest import TestCase
+from click.testing import CliRunner
+from solver.cli import batch
+from solver.lib.cache import SolutionCache
+
+LEVELS = pathlib.Path(__file__).parent.parent.parent / "levels"
+
+# Takes far longer than the timeouts used to solve with BFS
+SLOW_PUZZLE = [
+    ["PURPLE", "PURPLE", "RED", "PINK"],
+    ["LIGHT_GREEN", "YELLOW", "RED", "PINK"],
+    ["YELLOW", "YELLOW", "LIGHT_BLUE", "PURPLE"],
+    ["LIGHT_BLUE", "LIGHT_GREEN", "LIGHT_GREEN", "BLUE"],
+    ["LIGHT_BLUE", "BLUE", "RED", "BLUE"],
+    ["BLUE", "PINK", "RED", "YELLOW"],
+    ["PURPLE", "LIGHT_GREEN", "PINK", "LIGHT_BLUE"],
+    ["ORANGE", "GREEN", "ORANGE", "GREEN"],
+    ["GREEN", "ORANGE", "GREEN", "ORANGE"],
+    [],
+    [],
+]
+
+
+class TestBatch(TestCase):
+    """Test cases for solving puzzles in a batch."""
+
+    def test_find_puzzles(self):
+        """Directories, list files, puzzle files and globs are expanded."""
+        with tempfile.TemporaryDirectory() as tmp:
+            listing = pathlib.Path(tmp) / "puzzles.txt"
+            listing.write_text("# Levels\nlevel.json\n\nother.json\n")
+            self.assertEqual(
+                batch.find_puzzles([str(listing)]),
+                [
+                    str(pathlib.Path(tmp) / "level.json"),
+                    str(pathlib.Path(tmp) / "other.json"),
+                ],
+            )
+        debug = str(LEVELS / "debug.json")
+        self.assertEqual(batch.find_puzzles([debug]), [debug])
+        self.assertIn(debug, batch.find_puzzles([str(LEVELS)]))
+        self.assertEqual(
+            batch.find_puzzles([str(LEVELS / "deb*.json")]), [debug]
+        )
+
+    def test_solve(self):
+        """A solved puzzle is described with its moves and stats."""
+        record = batch.solve(
+            str(LEVELS / "debug.json"), "BFS", "OBJECT", False
+        )
+        self.assertTrue(record["solved"])
+        self.assertEqual(record["moves"], [[0, 2], [1, 2], [0, 1]])
+        self.assertEqual(record["length"], 3)
+        self.assertGreater(record["expanded"], 0)
+        self.assertGreaterEqual(record["time"], 0)
+
+    def test_solve_unsolvable_and_invalid(self):
+        """Unsolvable and invalid puzzles are reported rather than raised."""
+        record = batch.solve(str(LEVELS / "bad.json"), "BFS", "PACKED", False)
+        self.assertFalse(record["solved"])
+        self.assertIsNone(record["moves"])
+        record = batch.solve(str(LEVELS / "bad.json"), "BFS", "OBJECT", True)
+        self.assertIn("error", record, "Validation errors are reported")
+
+    def test_solve_with_cache(self):
+        """A second solve of the same puzzle comes from the cache."""
+        with tempfile.TemporaryDirectory() as tmp:
+            with SolutionCache(str(pathlib.Path(tmp) / "cache.db")) as cache:
+                path = str(LEVELS / "stat.json")
+                first = batch.solve(path, "BFS", "PACKED", False, cache)
+                second = batch.solve(path, "BFS", "PACKED", False, cache)
+        self.assertFalse(first["cached"])
+        self.assertTrue(second["cached"])
+        self.assertEqual(second["moves"], first["moves"])
+        self.assertEqual(second["expanded"], 0, "No search is needed")
+
+    def test_run_timeout(self):
+        """A puzzle taking too long is reported and the rest still solved."""
+        with tempfile.TemporaryDirectory() as tmp:
+            slow = pathlib.Path(tmp) / "slow.json"
+            slow.write_text(json.dumps(SLOW_PUZZLE))
+            output = io.StringIO()
+            batch.run(
+                [str(slow), str(LEVELS / "debug.json")],
+                output,
+                workers=1,
+                timeout=0.2,
+            )
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0]["error"], "timeout")
+        self.assertEqual(records[1]["length"], 3, "The next puzzle is solved")
+
+    def test_cli(self):
+        """Invoke the batch CLI and get one JSON line per puzzle."""
+        runner = CliRunner()
+        result = runner.invoke(
+            batch.cli,
+            [
+                "-a",
+                "astar",
+                "-w",
+                "2",
+                str(LEVELS / "debug.json"),
+                str(LEVELS / "simple_shows_differences.json"),
+            ],
+        )
+
+        self.assertEqual(result.exit_code, 0)
+        records = [json.loads(line) for line in result.output.splitlines()]
+        self.assertEqual(
+            sorted(record["length"] for record in records),
+            [3, 10],
+            "Each puzzle is solved optimally",
+        )
+
+    def test_cli_no_puzzles(self):
+        """Invoke with a pattern matching nothing and get an error."""
+        runner = CliRunner()
+        result = runner.invoke(batch.cli, ["./levels/*.none"])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertTrue(
+            "No puzzles found in SOURCES" in result.output,
+            "An empty batch is an error",
+        )
@@ -1,8 +1,15 @@
 """Tests for the main CLI."""
+import pathlib
 from unittest import TestCase
 from click.testing import CliRunner
 from solver.cli.main import cli
 
+LEVEL = str(
+    pathlib.Path(__file__).parent.parent.parent
+    / "levels"
+    / "simple_shows_differences.json"
+)
+
 
 class TestCli(TestCase):
     """Unit test cases for the solver cli."""
@@ -25,7 +32,8 @@ class TestCli(TestCase):
 
         self.assertEqual(result.exit_code, 0)
         self.assertTrue(
-            "-a, --algorithm [BFS|DFS]" in result.output,
+            "-a, --algorithm [BFS|DFS|ASTAR|IDASTAR|BEAM|ANYTIME]"
+            in result.output,
             "Options should be shown",
         )
         self.assertTrue(
@@ -53,6 +61,11 @@ class TestCli(TestCase):
             "Cannot be solved :(" in result.output,
             "This puzzle cannot be solved",
         )
+        self.assertTrue(
+            "Ruled out without searching as 5 RED can't fill whole "
+            "containers" in result.output,
+            "The reason is given without searching",
+        )
 
     def test_cli_bad_puzzle_fail_validate(self):
         """Invoke with a bad puzzle that cannot be solved."""
@@ -122,6 +135,235 @@ class TestCli(TestCase):
             "DFS output moves for this puzzle",
         )
 
+    def test_cli_astar_algorithm(self):
+        """Invoke with the A* algorithm and a known puzzle.
+
+        This should find a solution as short as the one found by BFS.
+        """
+        runner = CliRunner()
+        result = runner.invoke(
+            cli,
+            ["--algorithm=astar", "./levels/simple_shows_differences.json"],
+        )
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertTrue(
+            "Searching using A* Search" in result.output,
+            "Should show A* was used for the search",
+        )
+        self.assertTrue(
+            "solved in 10 moves" in result.output,
+            "A* takes 10 moves to solve this puzzle",
+        )
+
+    def test_cli_idastar_algorithm(self):
+        """Invoke with the IDA* algorithm, a small cache and a known puzzle.
+
+        This should find a solution as short as the one found by BFS.
+        """
+        runner = CliRunner()
+        result = runner.invoke(
+            cli,
+            [
+                "--algorithm=idastar",
+                "--cache-size=10",
+                "./levels/simple_shows_differences.json",
+            ],
+        )
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertTrue(
+            "Searching using Iterative Deepening A* Search" in result.output,
+            "Should show IDA* was used for the search",
+        )
+        self.assertTrue(
+            "solved in 10 moves" in result.output,
+            "IDA* takes 10 moves to solve this puzzle",
+        )
+
+    def test_cli_beam_algorithm(self):
+        """Invoke with the beam algorithm and a known puzzle."""
+        runner = CliRunner()
+        result = runner.invoke(
+            cli,
+            [
+                "--algorithm=beam",
+                "--beam-width=5",
+                "./levels/simple_shows_differences.json",
+            ],
+        )
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertTrue(
+            "Searching using Beam Search" in result.output,
+            "Should show beam search was used for the search",
+        )
+        self.assertTrue(
+            "solved in 10 moves" in result.output,
+            "Beam search takes 10 moves to solve this puzzle",
+        )
+
+    def test_cli_anytime_algorithm(self):
+        """Invoke with the anytime algorithm and a known puzzle."""
+        runner = CliRunner()
+        result = runner.invoke(
+            cli,
+            [
+                "--algorithm=anytime",
+                "--time-limit=60",
+                "./levels/simple_shows_differences.json",
+            ],
+        )
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertTrue(
+            "Searching using Anytime Weighted A* Search" in result.output,
+            "Should show anytime search was used for the search",
+        )
+        self.assertTrue(
+            "found a solution in" in result.output,
+            "Each improved solution is shown",
+        )
+        self.assertTrue(
+            "solved in 10 moves" in result.output,
+            "The anytime search ends with the shortest solution",
+        )
+
+    def test_cli_bfs_workers(self):
+        """Invoke BFS with multiple workers and a known puzzle."""
+        runner = CliRunner()
+        result = runner.invoke(
+            cli, ["--workers=2", "./levels/simple_shows_differences.json"]
+        )
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertTrue(
+            "(Move(src=0, dest=3), Move(src=0, dest=4), Move(src=1, dest=3), "
+            "Move(src=1, dest=4), Move(src=0, dest=1), Move(src=0, dest=3), "
+            "Move(src=2, dest=4), Move(src=2, dest=1), Move(src=2, dest=3), "
+            "Move(src=2, dest=4))" in result.output,
+            "Parallel BFS finds the same moves as BFS",
+        )
+
+    def test_cli_astar_workers(self):
+        """Invoke A* with multiple workers and a known puzzle."""
+        runner = CliRunner()
+        result = runner.invoke(
+            cli,
+            [
+                "-a",
+                "astar",
+                "--workers=2",
+                "./levels/simple_shows_differences.json",
+            ],
+        )
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertTrue(
+            "Searching using A* Search" in result.output,
+            "The algorithm is reported",
+        )
+        self.assertTrue(
+            "solved in 10 moves" in result.output,
+            "Distributed A* finds a shortest solution",
+        )
+
+    def test_cli_cache(self):
+        """Invoke twice with a cache and assert the second run uses it."""
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            args = ["--cache", "solutions.db", LEVEL]
+            first = runner.invoke(cli, args)
+            second = runner.invoke(cli, args)
+
+        self.assertEqual(first.exit_code, 0)
+        self.assertEqual(second.exit_code, 0)
+        self.assertFalse("Found a solution in the cache" in first.output)
+        self.assertTrue(
+            "Found a solution in the cache" in second.output,
+            "The stored solution is reused",
+        )
+        self.assertTrue("solved in 10 moves" in second.output)
+
+    def test_cli_cache_beam_width(self):
+        """Invoke beam searches of different widths with one cache."""
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            args = ["--cache", "solutions.db", "-a", "BEAM", LEVEL]
+            first = runner.invoke(cli, args + ["--beam-width", "1"])
+            second = runner.invoke(cli, args + ["--beam-width", "100"])
+            third = runner.invoke(cli, args + ["--beam-width", "100"])
+
+        self.assertEqual(first.exit_code, 0)
+        self.assertFalse(
+            "Found a solution in the cache" in second.output,
+            "A narrower beam's solution isn't reused",
+        )
+        self.assertTrue("Found a solution in the cache" in third.output)
+
+    def test_cli_symmetry(self):
+        """Invoke with symmetry reduction and a known puzzle."""
+        runner = CliRunner()
+        result = runner.invoke(cli, ["--symmetry", LEVEL])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertTrue("solved in 10 moves" in result.output)
+
+    def test_cli_partial_order(self):
+        """Invoke with partial order reduction and a known puzzle."""
+        runner = CliRunner()
+        result = runner.invoke(cli, ["--partial-order", LEVEL])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertTrue("solved in 10 moves" in result.output)
+
+    def test_cli_symmetry_requires_serial_search(self):
+        """Invoke with symmetry and workers and assert an error is raised."""
+        runner = CliRunner()
+        result = runner.invoke(cli, ["--symmetry", "-w", "2", LEVEL])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertTrue("Symmetry can't be used" in result.output)
+
+    def test_cli_workers_requires_bfs(self):
+        """Invoke DFS with multiple workers and assert an error is raised."""
+        runner = CliRunner()
+        result = runner.invoke(
+            cli, ["-a", "dfs", "-w", "2", "./levels/debug.json"]
+        )
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertTrue(
+            "Multiple workers can only be used with BFS" in result.output,
+            "Workers are only available for BFS",
+        )
+
+    def test_cli_numpy_engine(self):
+        """Invoke BFS using the NUMPY engine and a known puzzle."""
+        runner = CliRunner()
+        result = runner.invoke(
+            cli, ["--engine=numpy", "./levels/simple_shows_differences.json"]
+        )
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertTrue(
+            "solved in 10 moves" in result.output,
+            "BFS takes 10 moves to solve this puzzle",
+        )
+
+    def test_cli_numpy_engine_requires_bfs(self):
+        """Invoke DFS using the NUMPY engine and assert an error is raised."""
+        runner = CliRunner()
+        result = runner.invoke(
+            cli, ["-a", "dfs", "-e", "numpy", "./levels/debug.json"]
+        )
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertTrue(
+            "The NUMPY engine can only be used with BFS" in result.output,
+            "NUMPY engine is only available for BFS",
+        )
+
     def test_entrypoint(self):
         """Test directly running the module with the help argument.
 
@@ -136,7 +378,8 @@ class TestCli(TestCase):
         )
         self.assertEqual(result.returncode, 0)
         self.assertTrue(
-            "-a, --algorithm [BFS|DFS]" in result.stdout,
+            "-a, --algorithm [BFS|DFS|ASTAR|IDASTAR|BEAM|ANYTIME]"
+            in result.stdout,
             "Options should be shown",
         )
         self.assertTrue(
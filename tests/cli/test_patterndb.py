@@ -0,0 +1,72 @@
+"""Tests for the pattern database CLI."""
+import pathlib
+from unittest import TestCase
+from click.testing import CliRunner
+from solver.cli.main import cli as solve
+from solver.cli.patterndb import cli
+
+LEVELS = pathlib.Path(__file__).parent.parent.parent / "levels"
+
+
+class TestPatternDatabaseCli(TestCase):
+    """Unit test cases for building pattern databases."""
+
+    def test_build_and_solve(self):
+        """Build a database and use it to solve the same puzzle."""
+        runner = CliRunner()
+        level = str(LEVELS / "simple_shows_differences.json")
+        with runner.isolated_filesystem():
+            built = runner.invoke(cli, ["-c", "red", level, "level.pdb"])
+            result = runner.invoke(
+                solve, ["-a", "astar", "--pdb", "level.pdb", level]
+            )
+
+        self.assertEqual(built.exit_code, 0)
+        self.assertTrue("states for RED" in built.output)
+        self.assertEqual(result.exit_code, 0)
+        self.assertTrue("solved in 10 moves" in result.output)
+
+    def test_too_many_states(self):
+        """Building fails cleanly when the abstraction is too large."""
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            result = runner.invoke(
+                cli,
+                ["--max-states", "2", str(LEVELS / "stat.json"), "level.pdb"],
+            )
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertTrue("Too many abstract states" in result.output)
+
+    def test_pdb_must_match_puzzle(self):
+        """Using a database built for another puzzle shape is an error."""
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            built = runner.invoke(
+                cli,
+                ["-c", "red", str(LEVELS / "stat.json"), "level.pdb"],
+            )
+            result = runner.invoke(
+                solve,
+                [
+                    "-a",
+                    "astar",
+                    "--pdb",
+                    "level.pdb",
+                    str(LEVELS / "simple_shows_differences.json"),
+                ],
+            )
+
+        self.assertEqual(built.exit_code, 0)
+        self.assertEqual(result.exit_code, 2)
+        self.assertTrue("was built for" in result.output)
+
+    def test_pdb_requires_informed_search(self):
+        """Using a database with BFS is an error."""
+        runner = CliRunner()
+        result = runner.invoke(
+            solve, ["--pdb", "./levels/debug.json", "./levels/debug.json"]
+        )
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertTrue("can't be used with BFS or DFS" in result.output)
@@ -0,0 +1,26 @@
+"""Test how long the command line entry points take to start."""
+from unittest import TestCase
+
+from benchmarks.startup import BUDGET, DEFERRED, ENTRY_POINTS, import_times
+
+
+class TestStartup(TestCase):
+    """Test cases for the import time of the entry points."""
+
+    def test_deferred_imports(self):
+        """Slow optional modules are only imported when they are used."""
+        for module in ENTRY_POINTS:
+            imported = set(import_times(module))
+            self.assertIn(module, imported)
+            self.assertEqual(
+                imported.intersection(DEFERRED),
+                set(),
+                f"{module} should not import them up front",
+            )
+
+    def test_budget(self):
+        """Each entry point imports within the startup budget."""
+        for module in ENTRY_POINTS:
+            # Take the best of a few runs to keep other load out of it
+            elapsed = min(import_times(module)[module] for _ in range(3))
+            self.assertLess(elapsed, BUDGET, f"{module} is too slow")
@@ -0,0 +1,105 @@
+"""Tests for the cache module."""
+import os
+import tempfile
+from unittest import TestCase
+from solver.lib import search
+from solver.lib.cache import SolutionCache, canonical, search_tag
+from solver.lib.collection import ContainerCollection
+
+PUZZLE = [
+    ["BLUE", "ORANGE", "RED", "BLUE"],
+    ["ORANGE", "ORANGE", "RED", "BLUE"],
+    ["RED", "BLUE", "ORANGE", "RED"],
+    [],
+    [],
+]
+
+# The same puzzle with the containers re-ordered and the colours renamed
+RENAMED = [
+    [],
+    ["PINK", "PINK", "GREEN", "YELLOW"],
+    ["YELLOW", "PINK", "GREEN", "YELLOW"],
+    [],
+    ["GREEN", "YELLOW", "PINK", "GREEN"],
+]
+
+
+class TestCanonical(TestCase):
+    """Test cases for the canonical form of a puzzle."""
+
+    def test_isomorphic_puzzles_match(self):
+        """Re-ordering containers and renaming colours keeps the hash."""
+        key, order = canonical(ContainerCollection(PUZZLE))
+        other, other_order = canonical(ContainerCollection(RENAMED))
+        self.assertEqual(key, other)
+        self.assertEqual(sorted(order), list(range(len(PUZZLE))))
+        self.assertNotEqual(order, other_order)
+
+    def test_different_puzzles_differ(self):
+        """Puzzles that aren't the same shape don't share a hash."""
+        key, _ = canonical(ContainerCollection(PUZZLE))
+        swapped = [PUZZLE[0], PUZZLE[1], PUZZLE[2][::-1], [], []]
+        other, _ = canonical(ContainerCollection(swapped))
+        self.assertNotEqual(key, other)
+
+
+class TestSolutionCache(TestCase):
+    """Test cases for the solution cache."""
+
+    def setUp(self):
+        """Create a cache in a temporary directory."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "solutions.db")
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.tmp.cleanup()
+
+    def test_moves_are_remapped(self):
+        """A solution is returned with moves for the caller's containers."""
+        with SolutionCache(self.path) as cache:
+            expected = cache.solve(ContainerCollection(PUZZLE), search.bfs)
+        with SolutionCache(self.path) as cache:
+            puzzle = ContainerCollection(RENAMED)
+            result = cache.get(puzzle)
+        self.assertIsNotNone(result, "The solution persists")
+        self.assertEqual(len(result.moves), len(expected.moves))
+        for move in result.moves:
+            puzzle = puzzle.after(move)
+        self.assertTrue(puzzle.is_solved)
+        self.assertEqual(puzzle, result.collection)
+
+    def test_tags_are_separate(self):
+        """Solutions stored under one tag are not found under another."""
+        puzzle = ContainerCollection(PUZZLE)
+        with SolutionCache(self.path) as cache:
+            cache.put(puzzle, search.dfs(puzzle), "DFS")
+            self.assertIsNone(cache.get(puzzle, "BFS"))
+            self.assertIsNotNone(cache.get(puzzle, "DFS"))
+
+    def test_search_tag(self):
+        """Only complete searches are cached, by their parameters."""
+        self.assertEqual(search_tag("BFS", width=5, time_limit=1.0), "BFS")
+        self.assertNotEqual(
+            search_tag("BEAM", width=5),
+            search_tag("BEAM", width=10),
+            "Beam searches of different widths are kept apart",
+        )
+        self.assertEqual(search_tag("ANYTIME"), "ANYTIME")
+        self.assertIsNone(
+            search_tag("ANYTIME", time_limit=1.0),
+            "Time limited searches aren't cached",
+        )
+
+    def test_least_recently_used_evicted(self):
+        """Old solutions are removed once the cache is too large."""
+        puzzle = ContainerCollection(PUZZLE)
+        solution = search.bfs(puzzle)
+        with SolutionCache(self.path, max_size=460) as cache:
+            for tag in ("one", "two", "three"):
+                cache.put(puzzle, solution, tag)
+            cache.get(puzzle, "one")
+            cache.put(puzzle, solution, "four")
+            self.assertIsNotNone(cache.get(puzzle, "one"), "Recently used")
+            self.assertIsNone(cache.get(puzzle, "two"), "Least recently used")
+            self.assertIsNotNone(cache.get(puzzle, "four"))
@@ -1,9 +1,10 @@
 """Test the collection module."""
 import random
 from unittest import TestCase
-from solver.lib.collection import ContainerCollection
+from solver.lib.collection import ContainerCollection, PourCache, StateKey
 from solver.lib.container import Container
 from solver.lib.colour import Colour
+from solver.lib.item import Item
 from solver.lib.move import Move
 
 colours = list(Colour)
@@ -176,6 +177,50 @@ class TestContainerCollection(TestCase):
         )
         self.assertEqual(coll.after(Move(0, 1)), expected)
 
+    def test_after_shares_unchanged_containers(self):
+        """Only the containers poured between are replaced by a move."""
+        coll = ContainerCollection(
+            [
+                ["RED", "RED", "RED", "GREEN"],
+                ["BLUE", "GREEN"],
+                ["BLUE"],
+                [],
+            ]
+        )
+        _next = coll.after(Move(0, 1))
+        self.assertIs(_next[2], coll[2], "Unchanged containers are shared")
+        self.assertIs(_next[3], coll[3], "Unchanged containers are shared")
+        self.assertEqual(
+            coll[0], Container(["RED", "RED", "RED", "GREEN"]), "Unchanged"
+        )
+        self.assertEqual(coll[1], Container(["BLUE", "GREEN"]), "Unchanged")
+        self.assertEqual(_next[1], Container(["BLUE", "GREEN", "GREEN"]))
+
+    def test_construct_with_tuple(self):
+        """A tuple of containers is shared rather than copied."""
+        data = (Container(["RED"]), Container([]))
+        coll = ContainerCollection(data)
+        for container, shared in zip(coll.data, data):
+            self.assertIs(container, shared)
+            self.assertTrue(container.frozen, "Shared containers are frozen")
+        with self.assertRaises(TypeError):
+            ContainerCollection((["RED"], []))
+
+    def test_containers_are_frozen(self):
+        """Containers shared between collections can't be changed."""
+        coll = ContainerCollection([["RED", "GREEN"], ["GREEN"], []])
+        _next = coll.after(Move(0, 1))
+        for collection in (coll, _next, ContainerCollection(coll)):
+            for container in collection.data:
+                self.assertTrue(container.frozen)
+        with self.assertRaises(TypeError):
+            _next[0].add(Item("RED"))
+        with self.assertRaises(TypeError):
+            coll[0].pour(Container([]))
+        self.assertEqual(coll.after(Move(0, 1))[0], Container(["RED"]))
+        copy = _next[0].copy()
+        self.assertTrue(copy.add(Item("RED")), "Copies can be changed")
+
     def test_collection_equals_list(self):
         """Test collection equal to a list of containers."""
         coll = ContainerCollection(
@@ -193,3 +238,102 @@ class TestContainerCollection(TestCase):
             ]
         )
         self.assertNotEqual(coll, object())
+
+    def test_key_ignores_container_order(self):
+        """Collections with re-ordered containers share a key."""
+        coll = ContainerCollection([["RED", "GREEN"], ["GREEN"], []])
+        other = ContainerCollection([[], ["GREEN"], ["RED", "GREEN"]])
+        self.assertEqual(coll.key, other.key, "Keys should match")
+        self.assertEqual(hash(coll), hash(other), "Hashes should match")
+        self.assertIn(other, {coll}, "Collections can be used in a set")
+
+    def test_key_counts_duplicate_containers(self):
+        """Duplicate containers are counted rather than collapsed."""
+        coll = ContainerCollection(
+            [["RED", "GREEN"], ["RED", "GREEN"], ["GREEN", "RED"]]
+        )
+        other = ContainerCollection(
+            [["RED", "GREEN"], ["GREEN", "RED"], ["GREEN", "RED"]]
+        )
+        self.assertNotEqual(coll.key, other.key, "Keys should differ")
+        self.assertNotEqual(coll, other, "Collections should differ")
+
+    def test_key_compares_contents_on_shared_hash(self):
+        """Keys that share a hash are still told apart by their contents."""
+        coll = ContainerCollection([["RED", "GREEN"], ["GREEN"], []])
+        other = ContainerCollection([["GREEN", "RED"], ["GREEN"], []])
+        self.assertNotEqual(
+            StateKey(0, coll.data), StateKey(0, other.data), "Keys differ"
+        )
+        reordered = ContainerCollection([[], ["GREEN"], ["RED", "GREEN"]])
+        self.assertEqual(StateKey(0, coll.data), StateKey(0, reordered.data))
+        self.assertNotEqual(
+            StateKey(0, coll.data), StateKey(1, reordered.data)
+        )
+
+    def test_key_compares_capacities(self):
+        """Containers with the same contents but capacities differ."""
+        coll = ContainerCollection(
+            [Container(["RED"], 2), Container(["GREEN"], 4)]
+        )
+        other = ContainerCollection(
+            [Container(["RED"], 4), Container(["GREEN"], 2)]
+        )
+        self.assertEqual(coll.zobrist, other.zobrist, "Only contents hash")
+        self.assertNotEqual(coll.key, other.key, "Keys should differ")
+        self.assertNotEqual(coll, other, "Collections should differ")
+
+    def test_symmetric_key_ignores_colours(self):
+        """Collections that only differ by colour share a symmetric key."""
+        coll = ContainerCollection([["RED", "GREEN"], ["GREEN"], []])
+        other = ContainerCollection([[], ["BLUE"], ["PINK", "BLUE"]])
+        self.assertNotEqual(coll.key, other.key)
+        self.assertEqual(coll.symmetric_key, other.symmetric_key)
+        swapped = ContainerCollection([["GREEN", "RED"], ["GREEN"], []])
+        self.assertNotEqual(coll.symmetric_key, swapped.symmetric_key)
+
+    def test_pour_cache(self):
+        """Pours are worked out once per pair of contents."""
+        cache = PourCache(max_size=2)
+        src, dest = Container(["RED", "GREEN"]), Container(["GREEN"])
+        poured = cache.get(src, dest)
+        self.assertEqual(
+            poured, (Container(["RED"]), Container(["GREEN", "GREEN"]))
+        )
+        self.assertIs(
+            cache.get(Container(["RED", "GREEN"]), Container(["GREEN"])),
+            poured,
+            "The same contents are found in the cache",
+        )
+        blue = Container(["BLUE"])
+        self.assertIsNone(
+            cache.get(blue, src), "Invalid pours are cached as None"
+        )
+        self.assertIsNone(cache.get(blue, src))
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+        self.assertEqual(cache.hit_rate, 0.5)
+        self.assertIsNone(
+            cache.get(Container(["RED", "RED"]), Container([])),
+            "Single colour containers aren't poured into empty ones",
+        )
+        self.assertEqual(len(cache), 2, "The least recently used is dropped")
+        cache.get(src, dest)
+        self.assertEqual(cache.misses, 4, "The dropped pour is worked out")
+        cache.clear()
+        self.assertEqual((len(cache), cache.hits, cache.misses), (0, 0, 0))
+        self.assertEqual(cache.hit_rate, 0.0)
+
+    def test_pour_cache_shared_by_states(self):
+        """States made from a collection share its pour cache."""
+        puzzle = ContainerCollection([["RED", "GREEN"], ["GREEN"], []])
+        other = ContainerCollection([["RED", "GREEN"], ["GREEN"], []])
+        self.assertIsNot(puzzle.pours, other.pours, "Collections don't share")
+        self.assertIs(puzzle.after(Move(0, 1)).pours, puzzle.pours)
+        pours = PourCache()
+        shared = puzzle.with_pours(pours)
+        self.assertIs(shared.pours, pours)
+        self.assertIs(shared.after(Move(0, 1)).pours, pours)
+        self.assertEqual(shared, puzzle, "The containers are the same")
+        src, _ = pours.get(shared.data[0], shared.data[1])
+        with self.assertRaises(TypeError, msg="Cached pours can't change"):
+            src.add(Item("GREEN"))
@@ -1,7 +1,7 @@
 """Test the contianer module."""
 from unittest import TestCase, expectedFailure
-from solver.lib.container import Container
-from solver.lib.item import Item
+from solver.lib.container import Container, intern
+from solver.lib.item import Item, to_code
 from solver.lib.colour import Colour
 
 
@@ -306,6 +306,99 @@ class TestContainer(TestCase):
             "Two consecutive colours in src after pour",
         )
 
+    def test_is_solved_after_pour(self):
+        """The solved state is worked out again after a pour."""
+        src = Container(["RED", "RED", "RED", "GREEN"])
+        dest = Container(["GREEN", "GREEN", "GREEN"])
+        self.assertFalse(src.is_solved, "Mixed colours are not solved")
+        self.assertFalse(dest.is_solved, "Not full so not solved")
+        src.pour(dest)
+        self.assertFalse(src.is_solved, "Not full so not solved")
+        self.assertTrue(dest.is_solved, "Full of one colour so solved")
+        self.assertTrue(src.is_unique, "Only one colour left")
+
+    def test_codes(self):
+        """Items are stored as one byte colour codes."""
+        cont = Container(["RED", "GREEN", "GREEN"])
+        self.assertIsInstance(cont.codes, bytes)
+        self.assertEqual(
+            cont.codes,
+            bytes([to_code("RED"), to_code("GREEN"), to_code("GREEN")]),
+        )
+        self.assertEqual(
+            cont.data, (Item("RED"), Item("GREEN"), Item("GREEN"))
+        )
+        self.assertEqual(cont.head, Item("GREEN"))
+        self.assertEqual(Container(cont.data).codes, cont.codes)
+
+    def test_poured(self):
+        """Building poured copies matches pouring between copies."""
+        for src, dest in (
+            (["BLUE", "RED", "RED", "GREEN"], ["GREEN", "RED", "GREEN"]),
+            (["BLUE", "GREEN", "GREEN"], ["RED", "GREEN"]),
+            (["RED", "RED", "GREEN", "GREEN"], []),
+            (["GREEN", "GREEN", "GREEN"], ["GREEN"]),
+        ):
+            cont, target = Container(src), Container(dest)
+            poured_src, poured_dest = cont.poured(target)
+            self.assertEqual(cont, Container(src), "Source is unchanged")
+            self.assertEqual(target, Container(dest), "Target is unchanged")
+            copy, copy_target = cont.copy(), target.copy()
+            copy.pour(copy_target)
+            for poured, expected in (
+                (poured_src, copy),
+                (poured_dest, copy_target),
+            ):
+                self.assertEqual(poured, expected)
+                self.assertEqual(poured.zobrist, expected.zobrist)
+                self.assertEqual(poured.signature, expected.signature)
+                self.assertEqual(
+                    poured.num_matching_head, expected.num_matching_head
+                )
+                self.assertEqual(poured.is_solved, expected.is_solved)
+
+    def test_poured_invalid(self):
+        """Nothing can be poured from empty or into full or mismatched."""
+        for src, dest in (
+            ([], ["RED"]),
+            (["RED"], ["RED", "RED", "RED", "RED"]),
+            (["RED"], ["GREEN"]),
+        ):
+            with self.assertRaises(ValueError):
+                Container(src).poured(Container(dest))
+
+    def test_freeze(self):
+        """Frozen containers can't be changed but their copies can."""
+        cont = Container(["RED", "GREEN"])
+        self.assertFalse(cont.frozen)
+        self.assertIs(cont.freeze(), cont)
+        self.assertTrue(cont.frozen)
+        with self.assertRaises(TypeError):
+            cont.add(Item("GREEN"))
+        with self.assertRaises(TypeError):
+            cont.pour(Container([]))
+        with self.assertRaises(TypeError):
+            Container(["GREEN"]).pour(cont)
+        self.assertEqual(cont, Container(["RED", "GREEN"]), "Unchanged")
+        self.assertFalse(cont.copy().frozen)
+        poured = cont.poured(Container([]))
+        self.assertFalse(
+            any(container.frozen for container in poured),
+            "Poured copies are only frozen once interned",
+        )
+        self.assertTrue(intern(Container(["BLUE"])).frozen)
+
+    def test_intern(self):
+        """Containers with the same contents share one instance."""
+        first = intern(Container(["RED", "GREEN"]))
+        self.assertIs(intern(Container(["RED", "GREEN"])), first)
+        self.assertIsNot(intern(Container(["GREEN", "RED"])), first)
+        self.assertIsNot(
+            intern(Container(["RED", "GREEN"], 5)),
+            first,
+            "Containers of different capacities aren't shared",
+        )
+
     def test_container_from_container_with_lower_capacity(self):
         """Test creating a new container from a smaller one.
 
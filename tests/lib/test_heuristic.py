@@ -0,0 +1,92 @@
+"""Tests for the heuristic module."""
+from unittest import TestCase
+from solver.lib import heuristic, search
+from solver.lib.collection import ContainerCollection
+from solver.lib.container import Container
+from solver.lib.packed import PackedCollection
+
+PUZZLE = [
+    ["BLUE", "ORANGE", "RED", "BLUE"],
+    ["ORANGE", "ORANGE", "RED", "BLUE"],
+    ["RED", "BLUE", "ORANGE", "RED"],
+    [],
+    [],
+]
+
+
+class TestHeuristic(TestCase):
+    """Test cases for the heuristics."""
+
+    def test_solved(self):
+        """A solved collection needs no more moves."""
+        coll = ContainerCollection([["RED"] * 4, ["GREEN"] * 4, []])
+        self.assertEqual(heuristic.boundaries(coll), 0)
+        self.assertEqual(heuristic.splits(coll), 0)
+        self.assertEqual(heuristic.estimate(coll), 0)
+
+    def test_boundaries(self):
+        """Each change of colour inside a container is counted."""
+        coll = ContainerCollection([["RED", "RED", "GREEN", "RED"], ["GREEN"]])
+        self.assertEqual(heuristic.boundaries(coll), 2)
+
+    def test_splits(self):
+        """Each extra container holding a colour is counted."""
+        coll = ContainerCollection(
+            [["RED", "GREEN"], ["RED", "GREEN"], ["RED", "RED"], ["GREEN"]]
+        )
+        self.assertEqual(heuristic.splits(coll), 4)
+
+    def test_estimate_counts_extra_bottoms(self):
+        """Colours at the bottom of too many containers are counted."""
+        coll = ContainerCollection([["RED", "RED"], ["RED", "RED"], []])
+        self.assertEqual(heuristic.boundaries(coll), 0)
+        self.assertEqual(heuristic.estimate(coll), 1)
+
+    def test_mixed_capacities(self):
+        """Colours may fill several small containers once solved."""
+        coll = ContainerCollection(
+            [
+                Container(["RED", "RED"], 2),
+                Container(["RED", "RED"], 2),
+                Container([], 4),
+            ]
+        )
+        self.assertEqual(heuristic.splits(coll), 0)
+        self.assertEqual(heuristic.estimate(coll), 0)
+        puzzle = ContainerCollection(
+            [
+                Container([], 2),
+                Container(["BLUE"], 2),
+                Container(["GREEN", "RED", "BLUE", "GREEN"], 4),
+                Container(["GREEN", "BLUE", "BLUE"], 4),
+                Container([], 4),
+                Container(["RED", "GREEN"], 2),
+            ]
+        )
+        expected = search.bfs(puzzle)
+        self.assertEqual(len(expected.moves), 6, "Solved in 6 moves")
+        for search_function in (search.astar, search.idastar):
+            result = search_function(puzzle)
+            self.assertEqual(len(result.moves), len(expected.moves))
+
+    def test_packed_matches_collection(self):
+        """Both state types give the same estimates."""
+        coll = ContainerCollection(PUZZLE)
+        packed = PackedCollection.from_collection(coll)
+        for estimate in (
+            heuristic.boundaries,
+            heuristic.splits,
+            heuristic.estimate,
+        ):
+            self.assertEqual(estimate(packed), estimate(coll))
+
+    def test_admissible(self):
+        """No estimate exceeds the moves left on an optimal solution."""
+        coll = ContainerCollection(PUZZLE)
+        moves = search.bfs(coll).moves
+        for idx, move in enumerate(moves):
+            left = len(moves) - idx
+            self.assertLessEqual(heuristic.boundaries(coll), left)
+            self.assertLessEqual(heuristic.splits(coll), left)
+            self.assertLessEqual(heuristic.estimate(coll), left)
+            coll = coll.after(move)
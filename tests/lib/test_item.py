@@ -1,6 +1,6 @@
 """Tests for the item module."""
 from unittest import TestCase
-from solver.lib.item import Item
+from solver.lib.item import Item, from_code, to_code
 from solver.lib.colour import Colour
 
 
@@ -94,3 +94,15 @@ class TestItem(TestCase):
         self.assertFalse(
             Item(Colour.RED).__eq__(object), "Item does not equal a non-item"
         )
+
+    def test_codes(self):
+        """Every way of naming a colour gives the same code and back."""
+        code = to_code(Item(Colour.GREEN))
+        self.assertEqual(to_code(Colour.GREEN), code)
+        self.assertEqual(to_code("GREEN"), code)
+        self.assertGreater(code, 0, "Zero is left to mark an empty slot")
+        self.assertEqual(from_code(code), Item(Colour.GREEN))
+        self.assertNotEqual(to_code("RED"), code)
+        self.assertLess(
+            max(to_code(colour) for colour in Colour), 256, "Fits in a byte"
+        )
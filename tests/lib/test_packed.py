@@ -0,0 +1,107 @@
+"""Tests for the packed module."""
+import random
+from unittest import TestCase
+from solver.lib.collection import ContainerCollection
+from solver.lib.move import Move
+from solver.lib.packed import Layout, PackedCollection
+from solver.lib import search
+
+PUZZLE = [
+    ["BLUE", "ORANGE", "RED", "BLUE"],
+    ["ORANGE", "ORANGE", "RED", "BLUE"],
+    ["RED", "BLUE", "ORANGE", "RED"],
+    [],
+    [],
+]
+
+
+class TestPackedCollection(TestCase):
+    """Test cases for the packed collection."""
+
+    def test_round_trip(self):
+        """Packing and unpacking should give back the same collection."""
+        coll = ContainerCollection(PUZZLE)
+        packed = PackedCollection.from_collection(coll)
+        self.assertEqual(len(packed.state), 20, "One byte per slot")
+        self.assertEqual(packed.to_collection(), coll)
+        self.assertEqual(repr(packed.to_collection()), repr(coll))
+
+    def test_layout_rejects_mismatched_collection(self):
+        """Encoding a collection with a different shape is an error."""
+        layout = Layout.for_collection(ContainerCollection(PUZZLE))
+        with self.assertRaises(ValueError):
+            layout.encode(ContainerCollection([["RED"]]))
+
+    def test_moves_match_collection(self):
+        """Moves and states should follow the object model exactly."""
+        rng = random.Random(4)
+        coll = ContainerCollection(PUZZLE)
+        packed = PackedCollection.from_collection(coll)
+        for _ in range(40):
+            moves = coll.get_moves()
+            self.assertSequenceEqual(packed.get_moves(), moves)
+            self.assertEqual(packed.is_solved, coll.is_solved)
+            if not moves:
+                break
+            move = rng.choice(moves)
+            coll = coll.after(move)
+            packed = packed.after(move)
+            self.assertEqual(packed.to_collection(), coll)
+
+    def test_after_invalid_move(self):
+        """Test that an exception is raised trying to use an invalid move."""
+        packed = PackedCollection.from_collection(
+            ContainerCollection([["RED", "RED", "RED", "RED"], []])
+        )
+        self.assertFalse(packed.is_valid(Move(0, 1)))
+        self.assertFalse(packed.is_valid(Move(1, 0)))
+        with self.assertRaises(ValueError):
+            _ = packed.after(Move(0, 1))
+
+    def test_is_solved(self):
+        """Solved packed collections are detected."""
+        packed = PackedCollection.from_collection(
+            ContainerCollection([["RED"] * 4, [], ["GREEN"] * 4])
+        )
+        self.assertTrue(packed.is_solved)
+        self.assertEqual(packed.get_moves(), [])
+
+    def test_key_ignores_container_order(self):
+        """States with re-ordered containers share a key."""
+        layout = Layout.for_collection(ContainerCollection(PUZZLE))
+        packed = PackedCollection(
+            layout, layout.encode(ContainerCollection(PUZZLE))
+        )
+        other = PackedCollection(
+            layout, layout.encode(ContainerCollection(PUZZLE[::-1]))
+        )
+        self.assertEqual(packed.key, other.key)
+        self.assertEqual(packed, other)
+        self.assertEqual(hash(packed), hash(other))
+
+    def test_symmetric_key_ignores_colours(self):
+        """States that only differ by colour share a symmetric key."""
+        renamed = [
+            [
+                {"BLUE": "PINK", "ORANGE": "GREEN", "RED": "BLUE"}[item]
+                for item in container
+            ]
+            for container in PUZZLE
+        ]
+        packed = PackedCollection.from_collection(ContainerCollection(PUZZLE))
+        other = PackedCollection.from_collection(
+            ContainerCollection(renamed[::-1])
+        )
+        self.assertEqual(packed.symmetric_key, other.symmetric_key)
+        moved = packed.after(packed.get_moves()[0])
+        self.assertNotEqual(packed.symmetric_key, moved.symmetric_key)
+
+    def test_search_matches_object_model(self):
+        """Searching the packed engine gives the same solutions."""
+        coll = ContainerCollection(PUZZLE)
+        for solve in (search.bfs, search.dfs):
+            expected = solve(coll)
+            result = solve(coll, packed=True)
+            self.assertIsInstance(result.collection, ContainerCollection)
+            self.assertEqual(result.moves, expected.moves)
+            self.assertEqual(result.collection, expected.collection)
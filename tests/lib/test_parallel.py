@@ -0,0 +1,98 @@
+"""Tests for the parallel module."""
+from unittest import TestCase
+from solver.lib import parallel, search
+from solver.lib.collection import ContainerCollection
+
+PUZZLE = [
+    ["PURPLE", "PURPLE", "RED", "PINK"],
+    ["LIGHT_GREEN", "YELLOW", "RED", "PINK"],
+    ["YELLOW", "YELLOW", "LIGHT_BLUE", "PURPLE"],
+    ["LIGHT_BLUE", "LIGHT_GREEN", "LIGHT_GREEN", "BLUE"],
+    ["LIGHT_BLUE", "BLUE", "RED", "BLUE"],
+    ["BLUE", "PINK", "RED", "YELLOW"],
+    ["PURPLE", "LIGHT_GREEN", "PINK", "LIGHT_BLUE"],
+    [],
+    [],
+]
+
+
+def _failing_estimate(state):
+    """Raise an error as an estimate that can be sent to a worker."""
+    raise ValueError("State does not match the pattern database")
+
+
+class TestParallel(TestCase):
+    """Test cases for the parallel searches."""
+
+    def test_bfs_solved(self):
+        """Ensure the same collection is returned when already solved."""
+        puzzle = ContainerCollection([[]])
+        result = parallel.bfs(puzzle, workers=2)
+        self.assertEqual(result.collection, puzzle)
+        self.assertEqual(len(result.moves), 0)
+
+    def test_bfs_matches_search(self):
+        """The parallel search finds the same solution as `search.bfs`."""
+        coll = ContainerCollection(PUZZLE)
+        expected = search.bfs(coll)
+        for workers in (1, 2):
+            stats = search.SearchStats()
+            result = parallel.bfs(coll, stats, workers=workers)
+            self.assertEqual(result.moves, expected.moves)
+            self.assertEqual(result.collection, expected.collection)
+            self.assertGreater(stats.duplicates, 0, "Duplicates are pruned")
+
+    def test_bfs_unsolvable(self):
+        """An unsolvable puzzle has no solution."""
+        puzzle = ContainerCollection(
+            [["RED", "RED", "GREEN", "GREEN"], ["RED", "RED", "RED", "GREEN"]]
+        )
+        stats = search.SearchStats()
+        self.assertIsNone(parallel.bfs(puzzle, stats, workers=2))
+        self.assertIsNotNone(stats.unsolvable, "The reason is recorded")
+
+    def test_astar_solved(self):
+        """Ensure the same collection is returned when already solved."""
+        puzzle = ContainerCollection([[]])
+        result = parallel.astar(puzzle, workers=2)
+        self.assertEqual(result.collection, puzzle)
+        self.assertEqual(len(result.moves), 0)
+
+    def test_astar_is_optimal(self):
+        """The distributed A* search finds a shortest solution."""
+        coll = ContainerCollection(PUZZLE)
+        expected = search.bfs(coll)
+        for workers in (1, 3):
+            stats = search.SearchStats()
+            result = parallel.astar(coll, stats, workers=workers)
+            self.assertEqual(len(result.moves), len(expected.moves))
+            self.assertTrue(result.collection.is_solved)
+            self.assertGreater(stats.expanded, 0, "Workers report stats")
+            state = coll
+            for move in result.moves:
+                state = state.after(move)
+            self.assertEqual(state, result.collection, "The moves are valid")
+
+    def test_astar_unsolvable(self):
+        """An unsolvable puzzle has no solution."""
+        puzzle = ContainerCollection(
+            [["RED", "RED", "GREEN", "GREEN"], ["RED", "RED", "RED", "GREEN"]]
+        )
+        self.assertIsNone(parallel.astar(puzzle, workers=2))
+
+    def test_astar_worker_error(self):
+        """An error in a worker is raised rather than waiting forever."""
+        coll = ContainerCollection(PUZZLE)
+        for workers in (1, 2):
+            with self.assertRaisesRegex(ValueError, "pattern database"):
+                parallel.astar(
+                    coll, workers=workers, estimate=_failing_estimate
+                )
+
+    def test_owner_is_stable(self):
+        """Ownership doesn't depend on the process's hash seed."""
+        self.assertEqual(parallel._owner(b"\x01\x02", 7), 3066839698 % 7)
+        self.assertEqual(
+            parallel._owner((b"\x01", b"\x02"), 7),
+            parallel._owner(b"\x01\x02", 7),
+        )
@@ -0,0 +1,85 @@
+"""Tests for the patterndb module."""
+import os
+import pickle
+import tempfile
+from unittest import TestCase
+from solver.lib import patterndb, search
+from solver.lib.collection import ContainerCollection
+from solver.lib.packed import PackedCollection
+
+PUZZLE = [
+    ["BLUE", "ORANGE", "RED", "BLUE"],
+    ["ORANGE", "ORANGE", "RED", "BLUE"],
+    ["RED", "BLUE", "ORANGE", "RED"],
+    [],
+    [],
+]
+
+
+class TestPatternDatabase(TestCase):
+    """Test cases for building and using pattern databases."""
+
+    def setUp(self):
+        """Build a database for the puzzle with one pattern colour."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "puzzle.pdb")
+        self.puzzle = ContainerCollection(PUZZLE)
+        keys, distances = patterndb.build(self.puzzle, ["RED"])
+        self.assertEqual(keys, sorted(keys), "Keys are sorted")
+        with open(self.path, "wb") as file:
+            patterndb.write(file, self.puzzle, ["RED"], keys, distances)
+        self.database = patterndb.PatternDatabase(self.path)
+
+    def tearDown(self):
+        """Unmap and remove the database."""
+        self.database.close()
+        self.tmp.cleanup()
+
+    def test_admissible(self):
+        """The estimate never exceeds the moves left on a shortest path."""
+        result = search.bfs(self.puzzle)
+        state = self.puzzle
+        for done, move in enumerate(result.moves):
+            estimate = self.database(state)
+            self.assertLessEqual(estimate, len(result.moves) - done)
+            packed = PackedCollection.from_collection(state)
+            self.assertEqual(self.database(packed), estimate)
+            state = state.after(move)
+        self.assertEqual(self.database(state), 0, "Solved states are 0")
+        self.assertGreater(self.database(self.puzzle), 0)
+
+    def test_unknown_state(self):
+        """A state that wasn't reachable is estimated as 0."""
+        other = ContainerCollection(
+            [
+                ["RED", "RED", "RED", "BLUE"],
+                ["RED"] * 4,
+                ["BLUE", "BLUE", "BLUE", "RED"],
+                [],
+                [],
+            ]
+        )
+        self.assertEqual(self.database(other), 0)
+        with self.assertRaises(ValueError):
+            self.database(ContainerCollection([["RED"] * 4]))
+
+    def test_pickle(self):
+        """A pickled database maps the same file when unpickled."""
+        copy = pickle.loads(pickle.dumps(self.database))
+        self.assertEqual(copy.path, self.path)
+        self.assertEqual(copy(self.puzzle), self.database(self.puzzle))
+        copy.close()
+
+    def test_search(self):
+        """Searching with the database still finds a shortest solution."""
+        expected = len(search.bfs(self.puzzle).moves)
+        result = search.astar(self.puzzle, estimate=self.database)
+        self.assertEqual(len(result.moves), expected)
+
+    def test_not_a_database(self):
+        """Opening a file that isn't a database is an error."""
+        path = os.path.join(self.tmp.name, "other")
+        with open(path, "wb") as file:
+            file.write(bytes(32))
+        with self.assertRaises(ValueError):
+            patterndb.PatternDatabase(path)
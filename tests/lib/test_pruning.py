@@ -0,0 +1,116 @@
+"""Tests for the pruning module."""
+from unittest import TestCase
+from solver.lib import pruning, search
+from solver.lib.collection import ContainerCollection
+from solver.lib.container import Container
+from solver.lib.move import Move
+from solver.lib.packed import PackedCollection
+
+# Has the right number of each colour but no moves can be made
+STUCK = [
+    ["RED", "GREEN", "RED", "GREEN"],
+    ["GREEN", "RED", "GREEN", "RED"],
+]
+
+
+class TestPruning(TestCase):
+    """Test cases for finding puzzles and states that can't be solved."""
+
+    def test_colour_counts(self):
+        """A colour that can't fill whole containers is unsolvable."""
+        puzzle = ContainerCollection(
+            [
+                ["RED", "RED", "GREEN", "GREEN"],
+                ["RED", "RED", "RED", "GREEN"],
+                [],
+            ]
+        )
+        self.assertEqual(
+            pruning.unsolvable(puzzle), "5 RED can't fill whole containers"
+        )
+
+    def test_too_few_containers(self):
+        """Each colour needs containers of its own."""
+        puzzle = ContainerCollection(
+            [
+                Container(["RED", "GREEN", "BLUE", "YELLOW"], 4),
+                Container([], 1),
+                Container([], 1),
+            ]
+        )
+        self.assertEqual(
+            pruning.unsolvable(puzzle),
+            "4 containers are needed but there are 3",
+        )
+
+    def test_no_moves(self):
+        """A puzzle with no moves to make is unsolvable."""
+        puzzle = ContainerCollection(STUCK)
+        self.assertEqual(pruning.unsolvable(puzzle), "no moves can be made")
+        self.assertTrue(pruning.dead_end(puzzle))
+        self.assertTrue(
+            pruning.dead_end(PackedCollection.from_collection(puzzle))
+        )
+
+    def test_solvable(self):
+        """Puzzles that might be solved are not ruled out."""
+        puzzle = ContainerCollection(
+            [
+                ["RED", "GREEN", "RED", "GREEN"],
+                ["GREEN", "RED"],
+                ["RED", "GREEN"],
+                [],
+            ]
+        )
+        self.assertIsNone(pruning.unsolvable(puzzle))
+        self.assertFalse(pruning.dead_end(puzzle))
+        solved = ContainerCollection([["RED"] * 4, []])
+        self.assertFalse(pruning.dead_end(solved), "Solved isn't a dead end")
+
+    def test_searches_skip_unsolvable(self):
+        """Searches give up on an unsolvable puzzle without expanding it."""
+        puzzle = ContainerCollection(STUCK + [["BLUE"]])
+        for solve in (
+            search.bfs,
+            search.dfs,
+            search.astar,
+            search.idastar,
+            search.beam,
+        ):
+            stats = search.SearchStats()
+            self.assertIsNone(solve(puzzle, stats))
+            self.assertEqual(stats.expanded, 0)
+        self.assertEqual(list(search.anytime(puzzle)), [])
+
+    def test_redundant(self):
+        """Only one order of pours between separate containers is kept."""
+        puzzle = ContainerCollection(
+            [
+                ["RED", "GREEN", "RED"],
+                ["GREEN", "RED"],
+                ["BLUE", "GREEN", "BLUE"],
+                ["GREEN", "BLUE"],
+                [],
+            ]
+        )
+        first = puzzle.after(Move(2, 3))
+        for state in (first, PackedCollection.from_collection(first)):
+            self.assertTrue(pruning.redundant(state, Move(2, 3), Move(0, 1)))
+            self.assertFalse(
+                pruning.redundant(state, Move(0, 1), Move(2, 3)),
+                "The other order is kept",
+            )
+            self.assertFalse(
+                pruning.redundant(state, Move(2, 3), Move(1, 2)),
+                "Pours sharing a container are not independent",
+            )
+            self.assertFalse(
+                pruning.redundant(state, Move(2, 3), Move(0, 4)),
+                "Pours into empty containers are kept",
+            )
+            self.assertFalse(pruning.redundant(state, None, Move(0, 1)))
+        into_empty = puzzle.after(Move(2, 4))
+        self.assertFalse(
+            pruning.redundant(into_empty, Move(2, 4), Move(0, 1)),
+            "Pours after one into an empty container are kept",
+        )
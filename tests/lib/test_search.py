@@ -1,7 +1,10 @@
 """Tests for the search module."""
+import inspect
+import sys
 from unittest import TestCase
 from solver.lib import search
 from solver.lib.collection import ContainerCollection
+from solver.lib.container import Container
 from solver.lib.move import Move
 
 
@@ -154,3 +157,321 @@ class TestSearch(TestCase):
         self.assertEqual(result.collection, expected)
         self.assertEqual(len(result.moves), 34, "Solved in 34 moves")
         self.assertEqual(result.moves, solution)
+
+    def test_bfs_stats(self):
+        """Ensure duplicate states are pruned and reported by bfs."""
+        puzzle = ContainerCollection(
+            [
+                ["BLUE", "ORANGE", "RED", "BLUE"],
+                ["ORANGE", "ORANGE", "RED", "BLUE"],
+                ["RED", "BLUE", "ORANGE", "RED"],
+                [],
+                [],
+            ]
+        )
+        stats = search.SearchStats()
+        result = search.bfs(puzzle, stats)
+        self.assertEqual(len(result.moves), 10, "Solved in 10 moves")
+        self.assertGreater(stats.duplicates, 0, "Duplicates are pruned")
+        self.assertLessEqual(
+            stats.expanded + stats.duplicates,
+            stats.generated + 1,
+            "Each state is expanded at most once",
+        )
+
+    def test_pour_cache_per_search(self):
+        """Ensure each search counts pours in a cache of its own."""
+        puzzle = ContainerCollection(
+            [
+                ["BLUE", "ORANGE", "RED", "BLUE"],
+                ["ORANGE", "ORANGE", "RED", "BLUE"],
+                ["RED", "BLUE", "ORANGE", "RED"],
+                [],
+                [],
+            ]
+        )
+        first, second = search.SearchStats(), search.SearchStats()
+        search.bfs(puzzle, first)
+        search.bfs(puzzle, second)
+        self.assertGreater(first.pour_hits, 0, "Repeated pours are found")
+        self.assertEqual(
+            (first.pour_hits, first.pour_misses),
+            (second.pour_hits, second.pour_misses),
+            "The second search doesn't reuse the first one's cache",
+        )
+        self.assertGreater(second.pour_hit_rate, 0.0)
+
+    def test_mixed_capacities(self):
+        """Ensure states with different capacities aren't merged."""
+        puzzle = ContainerCollection(
+            [
+                Container(["GREEN", "RED"], 2),
+                Container(["GREEN"], 4),
+                Container(["GREEN", "RED", "BLUE"], 4),
+                Container(["RED", "RED"], 2),
+                Container(["RED", "GREEN", "GREEN", "RED"], 4),
+                Container(["BLUE", "GREEN"], 2),
+            ]
+        )
+        for packed in (False, True):
+            for search_function in (search.bfs, search.astar):
+                result = search_function(puzzle, packed=packed)
+                self.assertIsNotNone(result, "The puzzle can be solved")
+                self.assertTrue(result.collection.is_solved)
+                self.assertEqual(len(result.moves), 7, "Solved in 7 moves")
+
+    def test_node_moves(self):
+        """Ensure the moves are rebuilt from the parent pointers."""
+        root = search._Node()
+        child = search._Node(search._Node(root, Move(0, 1)), Move(1, 2))
+        self.assertEqual(root.moves(), tuple(), "The root has no moves")
+        self.assertEqual(child.depth, 2, "Child is two moves deep")
+        self.assertEqual(child.moves(), (Move(0, 1), Move(1, 2)))
+
+    def test_dfs_deeper_than_recursion_limit(self):
+        """Ensure dfs does not recurse once per move."""
+        puzzle = ContainerCollection(
+            [
+                ["RED", "ORANGE", "LIGHT_GREEN", "LIGHT_BLUE"],
+                ["GREY", "ORANGE", "BLUE", "GREY"],
+                ["ORANGE", "RED", "LIGHT_BLUE", "ORANGE"],
+                ["GREY", "PINK", "GREEN", "BLUE"],
+                ["PINK", "RED", "LIGHT_GREEN", "PINK"],
+                ["LIGHT_BLUE", "PURPLE", "GREEN", "LIGHT_BLUE"],
+                ["LIGHT_GREEN", "GREY", "RED", "GREEN"],
+                ["PURPLE", "PINK", "BLUE", "BLUE"],
+                ["PURPLE", "LIGHT_GREEN", "PURPLE", "GREEN"],
+                [],
+                [],
+            ]
+        )
+        limit = sys.getrecursionlimit()
+        # Leave fewer spare frames than the 34 moves in the solution
+        sys.setrecursionlimit(len(inspect.stack()) + 25)
+        try:
+            result = search.dfs(puzzle)
+        finally:
+            sys.setrecursionlimit(limit)
+        self.assertTrue(result.collection.is_solved)
+        self.assertEqual(len(result.moves), 34, "Solved in 34 moves")
+
+    def test_astar_solved(self):
+        """Ensure the same collection is returned when already solved."""
+        puzzle = ContainerCollection([[]])
+        result = search.astar(puzzle)
+        self.assertEqual(result.collection, puzzle)
+        self.assertEqual(len(result.moves), 0)
+
+    def test_astar_matches_bfs(self):
+        """Ensure A* finds a solution as short as bfs with less work."""
+        puzzle = ContainerCollection(
+            [
+                ["PURPLE", "PURPLE", "RED", "PINK"],
+                ["LIGHT_GREEN", "YELLOW", "RED", "PINK"],
+                ["YELLOW", "YELLOW", "LIGHT_BLUE", "PURPLE"],
+                ["LIGHT_BLUE", "LIGHT_GREEN", "LIGHT_GREEN", "BLUE"],
+                ["LIGHT_BLUE", "BLUE", "RED", "BLUE"],
+                ["BLUE", "PINK", "RED", "YELLOW"],
+                ["PURPLE", "LIGHT_GREEN", "PINK", "LIGHT_BLUE"],
+                [],
+                [],
+            ]
+        )
+        bfs_stats = search.SearchStats()
+        expected = search.bfs(puzzle, bfs_stats)
+        for packed in (False, True):
+            stats = search.SearchStats()
+            result = search.astar(puzzle, stats, packed=packed)
+            self.assertTrue(result.collection.is_solved)
+            self.assertEqual(len(result.moves), len(expected.moves))
+            self.assertLess(stats.expanded, bfs_stats.expanded)
+
+    def test_astar_unsolvable(self):
+        """Ensure A* reports a puzzle that cannot be solved."""
+        puzzle = ContainerCollection(
+            [
+                ["RED", "RED", "GREEN", "GREEN"],
+                ["RED", "RED", "RED", "GREEN"],
+                [],
+            ]
+        )
+        stats = search.SearchStats()
+        self.assertIsNone(search.astar(puzzle, stats))
+        self.assertEqual(
+            stats.unsolvable,
+            "5 RED can't fill whole containers",
+            "The reason is recorded",
+        )
+        self.assertEqual(stats.expanded, 0, "Nothing is searched")
+
+    def test_idastar_matches_bfs(self):
+        """Ensure IDA* finds a solution as short as bfs."""
+        puzzle = ContainerCollection(
+            [
+                ["PURPLE", "PURPLE", "RED", "PINK"],
+                ["LIGHT_GREEN", "YELLOW", "RED", "PINK"],
+                ["YELLOW", "YELLOW", "LIGHT_BLUE", "PURPLE"],
+                ["LIGHT_BLUE", "LIGHT_GREEN", "LIGHT_GREEN", "BLUE"],
+                ["LIGHT_BLUE", "BLUE", "RED", "BLUE"],
+                ["BLUE", "PINK", "RED", "YELLOW"],
+                ["PURPLE", "LIGHT_GREEN", "PINK", "LIGHT_BLUE"],
+                [],
+                [],
+            ]
+        )
+        expected = search.bfs(puzzle)
+        for cache_size in (1, 1000):
+            result = search.idastar(puzzle, cache_size=cache_size)
+            self.assertTrue(result.collection.is_solved)
+            self.assertEqual(len(result.moves), len(expected.moves))
+
+    def test_idastar_solved_and_unsolvable(self):
+        """Ensure IDA* handles solved and unsolvable puzzles."""
+        puzzle = ContainerCollection([[]])
+        self.assertEqual(len(search.idastar(puzzle).moves), 0)
+        puzzle = ContainerCollection(
+            [
+                ["RED", "RED", "GREEN", "GREEN"],
+                ["RED", "RED", "RED", "GREEN"],
+                [],
+            ]
+        )
+        self.assertIsNone(search.idastar(puzzle, packed=True))
+
+    def test_beam(self):
+        """Ensure beam search finds a solution between bfs and dfs."""
+        puzzle = ContainerCollection(
+            [
+                ["RED", "ORANGE", "LIGHT_GREEN", "LIGHT_BLUE"],
+                ["GREY", "ORANGE", "BLUE", "GREY"],
+                ["ORANGE", "RED", "LIGHT_BLUE", "ORANGE"],
+                ["GREY", "PINK", "GREEN", "BLUE"],
+                ["PINK", "RED", "LIGHT_GREEN", "PINK"],
+                ["LIGHT_BLUE", "PURPLE", "GREEN", "LIGHT_BLUE"],
+                ["LIGHT_GREEN", "GREY", "RED", "GREEN"],
+                ["PURPLE", "PINK", "BLUE", "BLUE"],
+                ["PURPLE", "LIGHT_GREEN", "PURPLE", "GREEN"],
+                [],
+                [],
+            ]
+        )
+        shortest = len(search.astar(puzzle).moves)
+        for packed in (False, True):
+            stats = search.SearchStats()
+            result = search.beam(puzzle, stats, packed=packed, width=20)
+            self.assertTrue(result.collection.is_solved)
+            self.assertGreaterEqual(len(result.moves), shortest)
+            self.assertLessEqual(len(result.moves), 34, "No worse than dfs")
+            self.assertLessEqual(
+                stats.expanded,
+                20 * len(result.moves),
+                "At most the beam width is expanded at each depth",
+            )
+
+    def test_beam_solved(self):
+        """Ensure the same collection is returned when already solved."""
+        puzzle = ContainerCollection([[]])
+        self.assertEqual(len(search.beam(puzzle).moves), 0)
+
+    def test_astar_weighted(self):
+        """Ensure a weighted A* is no worse than the weight allows."""
+        puzzle = ContainerCollection(
+            [
+                ["BLUE", "ORANGE", "RED", "BLUE"],
+                ["ORANGE", "ORANGE", "RED", "BLUE"],
+                ["RED", "BLUE", "ORANGE", "RED"],
+                [],
+                [],
+            ]
+        )
+        result = search.astar(puzzle, weight=2)
+        self.assertTrue(result.collection.is_solved)
+        self.assertLessEqual(len(result.moves), 20)
+
+    def test_anytime(self):
+        """Ensure each solution is shorter and the last is optimal."""
+        puzzle = ContainerCollection(
+            [
+                ["RED", "ORANGE", "LIGHT_GREEN", "LIGHT_BLUE"],
+                ["GREY", "ORANGE", "BLUE", "GREY"],
+                ["ORANGE", "RED", "LIGHT_BLUE", "ORANGE"],
+                ["GREY", "PINK", "GREEN", "BLUE"],
+                ["PINK", "RED", "LIGHT_GREEN", "PINK"],
+                ["LIGHT_BLUE", "PURPLE", "GREEN", "LIGHT_BLUE"],
+                ["LIGHT_GREEN", "GREY", "RED", "GREEN"],
+                ["PURPLE", "PINK", "BLUE", "BLUE"],
+                ["PURPLE", "LIGHT_GREEN", "PURPLE", "GREEN"],
+                [],
+                [],
+            ]
+        )
+        results = list(search.anytime(puzzle, weights=(10, 1)))
+        lengths = [len(result.moves) for result in results]
+        self.assertGreater(len(results), 0, "A solution is found")
+        self.assertTrue(all(result.collection.is_solved for result in results))
+        self.assertEqual(lengths, sorted(set(lengths), reverse=True))
+        self.assertEqual(lengths[-1], len(search.astar(puzzle).moves))
+
+    def test_anytime_time_limit(self):
+        """Ensure the anytime search stops once out of time."""
+        puzzle = ContainerCollection(
+            [
+                ["BLUE", "ORANGE", "RED", "BLUE"],
+                ["ORANGE", "ORANGE", "RED", "BLUE"],
+                ["RED", "BLUE", "ORANGE", "RED"],
+                [],
+                [],
+            ]
+        )
+        self.assertEqual(list(search.anytime(puzzle, time_limit=0)), [])
+        solved = ContainerCollection([[]])
+        self.assertEqual(len(list(search.anytime(solved))), 1)
+
+    def test_symmetry(self):
+        """Searching with symmetry finds solutions of the same length."""
+        puzzle = ContainerCollection(
+            [
+                ["BLUE", "ORANGE", "RED", "BLUE"],
+                ["ORANGE", "ORANGE", "RED", "BLUE"],
+                ["RED", "BLUE", "ORANGE", "RED"],
+                [],
+                [],
+            ]
+        )
+        expected = len(search.bfs(puzzle).moves)
+        for solve in (search.bfs, search.astar, search.idastar):
+            for packed in (False, True):
+                result = solve(puzzle, packed=packed, symmetry=True)
+                self.assertEqual(len(result.moves), expected)
+                state = puzzle
+                for move in result.moves:
+                    state = state.after(move)
+                self.assertTrue(state.is_solved, "The moves are real moves")
+        self.assertIsNotNone(search.dfs(puzzle, symmetry=True))
+        self.assertIsNotNone(search.beam(puzzle, symmetry=True))
+
+    def test_reduction(self):
+        """Skipping re-ordered pours finds solutions of the same length."""
+        puzzle = ContainerCollection(
+            [
+                ["PURPLE", "PURPLE", "RED", "PINK"],
+                ["LIGHT_GREEN", "YELLOW", "RED", "PINK"],
+                ["YELLOW", "YELLOW", "LIGHT_BLUE", "PURPLE"],
+                ["LIGHT_BLUE", "LIGHT_GREEN", "LIGHT_GREEN", "BLUE"],
+                ["LIGHT_BLUE", "BLUE", "RED", "BLUE"],
+                ["BLUE", "PINK", "RED", "YELLOW"],
+                ["PURPLE", "LIGHT_GREEN", "PINK", "LIGHT_BLUE"],
+                [],
+                [],
+            ]
+        )
+        stats = search.SearchStats()
+        expected = search.bfs(puzzle, stats, packed=True)
+        for solve in (search.bfs, search.astar, search.idastar):
+            reduced = search.SearchStats()
+            result = solve(puzzle, reduced, packed=True, reduction=True)
+            self.assertEqual(len(result.moves), len(expected.moves))
+            if solve is search.bfs:
+                self.assertLess(reduced.generated, stats.generated)
+        self.assertIsNotNone(search.dfs(puzzle, reduction=True))
+        self.assertIsNotNone(search.beam(puzzle, reduction=True))
@@ -0,0 +1,31 @@
+"""Tests for the symmetry module."""
+from unittest import TestCase
+from solver.lib.symmetry import canonical_form
+
+
+class TestCanonicalForm(TestCase):
+    """Test cases for the canonical form of a puzzle."""
+
+    def test_renamed_and_reordered(self):
+        """Renaming colours and re-ordering containers keeps the form."""
+        puzzle = ["ABA", "BB", "", "AC"]
+        renamed = ["XZ", "", "YY", "XYX"]
+        order, form = canonical_form([(4, content) for content in puzzle])
+        other_order, other = canonical_form(
+            [(4, content) for content in renamed]
+        )
+        self.assertEqual(form, other)
+        rename = str.maketrans("ABC", "XYZ")
+        self.assertEqual(
+            [puzzle[idx].translate(rename) for idx in order],
+            [renamed[idx] for idx in other_order],
+            "The orders match up the same containers",
+        )
+
+    def test_different_puzzles(self):
+        """Puzzles that can't be renamed into each other differ."""
+        _, form = canonical_form([(4, "AB"), (4, "BA")])
+        _, other = canonical_form([(4, "AB"), (4, "AB")])
+        self.assertNotEqual(form, other)
+        _, capacity = canonical_form([(4, "AB"), (5, "BA")])
+        self.assertNotEqual(form, capacity, "Capacities are kept")
@@ -0,0 +1,62 @@
+"""Tests for the vectorised module."""
+from unittest import TestCase
+from solver.lib import search, vectorised
+from solver.lib.collection import ContainerCollection
+from solver.lib.container import Container
+
+
+class TestVectorised(TestCase):
+    """Test cases for the vectorised breadth-first search."""
+
+    def test_bfs_solved(self):
+        """Ensure the same collection is returned when already solved."""
+        puzzle = ContainerCollection([[]])
+        result = vectorised.bfs(puzzle)
+        self.assertEqual(result.collection, puzzle)
+        self.assertEqual(len(result.moves), 0)
+
+    def test_bfs_matches_search(self):
+        """The vectorised search finds the same solution as `search.bfs`."""
+        puzzles = [
+            [
+                ["BLUE", "ORANGE", "RED", "BLUE"],
+                ["ORANGE", "ORANGE", "RED", "BLUE"],
+                ["RED", "BLUE", "ORANGE", "RED"],
+                [],
+                [],
+            ],
+            [
+                ["PURPLE", "PURPLE", "RED", "PINK"],
+                ["LIGHT_GREEN", "YELLOW", "RED", "PINK"],
+                ["YELLOW", "YELLOW", "LIGHT_BLUE", "PURPLE"],
+                ["LIGHT_BLUE", "LIGHT_GREEN", "LIGHT_GREEN", "BLUE"],
+                ["LIGHT_BLUE", "BLUE", "RED", "BLUE"],
+                ["BLUE", "PINK", "RED", "YELLOW"],
+                ["PURPLE", "LIGHT_GREEN", "PINK", "LIGHT_BLUE"],
+                [],
+                [],
+            ],
+        ]
+        for puzzle in puzzles:
+            coll = ContainerCollection(puzzle)
+            expected = search.bfs(coll)
+            stats = search.SearchStats()
+            result = vectorised.bfs(coll, stats)
+            self.assertEqual(result.moves, expected.moves)
+            self.assertEqual(result.collection, expected.collection)
+            self.assertGreater(stats.duplicates, 0, "Duplicates are pruned")
+
+    def test_bfs_unsolvable(self):
+        """An unsolvable puzzle has no solution."""
+        puzzle = ContainerCollection(
+            [["RED", "RED", "GREEN", "GREEN"], ["RED", "RED", "RED", "GREEN"]]
+        )
+        self.assertIsNone(vectorised.bfs(puzzle))
+
+    def test_bfs_mixed_capacity(self):
+        """Containers of different capacities are rejected."""
+        puzzle = ContainerCollection(
+            [Container(["RED", "GREEN"], 2), Container(["GREEN", "RED"])]
+        )
+        with self.assertRaises(ValueError):
+            vectorised.bfs(puzzle)
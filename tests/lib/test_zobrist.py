@@ -0,0 +1,67 @@
+"""Test the zobrist module."""
+import random
+from unittest import TestCase
+
+from solver.lib import zobrist
+from solver.lib.collection import ContainerCollection
+from solver.lib.colour import Colour
+from solver.lib.container import Container
+
+colours = [colour.name for colour in Colour]
+
+
+class TestZobrist(TestCase):
+    """Test cases for incremental Zobrist hashing."""
+
+    def test_piece_is_stable(self):
+        """The values only depend on the height and colour."""
+        self.assertEqual(zobrist.piece(0, "RED"), zobrist.piece(0, "RED"))
+        self.assertNotEqual(zobrist.piece(0, "RED"), zobrist.piece(1, "RED"))
+        self.assertNotEqual(zobrist.piece(0, "RED"), zobrist.piece(0, "BLUE"))
+        self.assertLessEqual(zobrist.piece(3, "RED"), zobrist.MASK)
+
+    def test_pour_updates_hashes(self):
+        """Pouring gives the same hashes as hashing from scratch."""
+        src = Container(["RED", "GREEN", "GREEN"])
+        dest = Container(["GREEN"])
+        src.pour(dest)
+        self.assertEqual(src.zobrist, Container(["RED"]).zobrist)
+        self.assertEqual(
+            dest.zobrist, Container(["GREEN", "GREEN", "GREEN"]).zobrist
+        )
+        self.assertEqual(Container([]).zobrist, 0, "Empty containers are 0")
+
+    def test_after_updates_hash(self):
+        """Hashes updated by moves match hashing the resulting state."""
+        rng = random.Random(4)
+        for _ in range(20):
+            items = [colour for colour in colours[:5] for _ in range(4)]
+            rng.shuffle(items)
+            collection = ContainerCollection(
+                [items[idx : idx + 4] for idx in range(0, 20, 4)] + [[], []]
+            )
+            for _ in range(10):
+                moves = collection.get_moves()
+                if not moves:
+                    break
+                collection = collection.after(rng.choice(moves))
+                fresh = ContainerCollection(
+                    [list(container.data) for container in collection.data]
+                )
+                self.assertEqual(collection.zobrist, fresh.zobrist)
+
+    def test_duplicates_do_not_cancel(self):
+        """Identical containers are counted rather than cancelled out."""
+        pair = ContainerCollection([["RED", "GREEN"], ["RED", "GREEN"]])
+        empty = ContainerCollection([[], []])
+        self.assertNotEqual(pair.zobrist, empty.zobrist)
+
+    def test_combine_ignores_order(self):
+        """Re-ordering containers gives the same hash."""
+        coll = ContainerCollection([["RED", "GREEN"], ["GREEN"], []])
+        other = ContainerCollection([[], ["GREEN"], ["RED", "GREEN"]])
+        self.assertEqual(coll.zobrist, other.zobrist)
+        self.assertEqual(
+            zobrist.replace(coll.zobrist, [coll[1].zobrist], [0]),
+            ContainerCollection([["RED", "GREEN"], [], []]).zobrist,
+        )